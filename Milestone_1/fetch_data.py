@@ -1,7 +1,9 @@
 import pandas as pd
-import requests
 import time
 
+# Same pooled Binance session and used-weight pacing as the refresh pipeline
+from refresh_data_pipeline import _SESSION, _weight_backoff, MAX_429_RETRIES
+
 def fetch_klines(symbol, interval, start_ms, end_ms):
     url = "https://api.binance.com/api/v3/klines"
     out = []
@@ -18,7 +20,11 @@ def fetch_klines(symbol, interval, start_ms, end_ms):
             "limit": limit
         }
         
-        r = requests.get(url, params=params)
+        for attempt in range(MAX_429_RETRIES + 1):
+            r = _SESSION.get(url, params=params, timeout=15)
+            if r.status_code != 429 or attempt == MAX_429_RETRIES:
+                break
+            time.sleep(float(r.headers.get("Retry-After", 2 ** attempt)))
         r.raise_for_status()
         data = r.json()
 
@@ -36,7 +42,9 @@ def fetch_klines(symbol, interval, start_ms, end_ms):
             break
 
         current = next_ts
-        time.sleep(0.25)  
+        wait = _weight_backoff(r)
+        if wait:
+            time.sleep(wait)
 
     return out
 
@@ -15,14 +15,22 @@ Usage:
 
 import pandas as pd
 import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import time
 import os
 import datetime
+import threading
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
 from sklearn.preprocessing import MinMaxScaler
 import joblib
-import warnings
-warnings.filterwarnings('ignore')
+
+try:
+    import bottleneck as bn
+except ImportError:  # fall back to pandas rolling windows
+    bn = None
 
 # ===== CONFIGURATION =====
 BASE_DIR = "/Users/ayushgupta/Desktop/ML-Driven-Web-Platform-for-Cryptocurrency-Price-Forecasting_November_Batch-5_2025/Milestone_1"
@@ -46,6 +54,14 @@ VAL_RATIO = 0.15
 
 # Sequence parameters
 SEQ_LEN = 48
+HOUR_MS = 3_600_000
+
+# Raw and processed frames are stored as zstd-compressed Parquet
+PARQUET_ENGINE = "pyarrow"
+PARQUET_COMPRESSION = "zstd"
+
+# Rows of processed history used to warm up rolling features (longest window is 168)
+FEATURE_WARMUP_ROWS = 200
 HORIZONS = [1, 24]
 
 # Feature columns
@@ -56,6 +72,58 @@ FEATURE_COLS = [
     "vol_change", "missing_flag"
 ]
 
+# Shared HTTP session: keeps the TLS connection to Binance alive across pages.
+# 429s are handled in fetch_klines so Retry-After and the weight budget are honored.
+_SESSION = requests.Session()
+_SESSION.headers.update({"User-Agent": "CryptoForecast/1.0"})
+_SESSION.mount("https://", HTTPAdapter(
+    pool_connections=10,
+    pool_maxsize=20,
+    max_retries=Retry(total=5, backoff_factor=0.5, status_forcelist=[500, 502, 503, 504]),
+))
+
+# Binance allows 1200 requests/min per IP; shared by all fetch workers
+BINANCE_MAX_REQUESTS_PER_MIN = 1200
+BINANCE_WEIGHT_LIMIT_1M = 1200
+BINANCE_WEIGHT_SOFT_LIMIT_1M = 1000  # start slowing down above this used weight
+MAX_429_RETRIES = 5
+MAX_WORKERS = min(len(COINS), os.cpu_count() or 1)
+
+
+class _RateLimiter:
+    """Token bucket shared across threads to respect the Binance request budget."""
+
+    def __init__(self, rate_per_min):
+        self.capacity = float(rate_per_min)
+        self.tokens = float(rate_per_min)
+        self.fill_rate = rate_per_min / 60.0
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.fill_rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.fill_rate
+            time.sleep(wait)
+
+
+_RATE_LIMITER = _RateLimiter(BINANCE_MAX_REQUESTS_PER_MIN)
+
+
+def _weight_backoff(response):
+    """Seconds to wait based on the used request weight Binance reports."""
+    used = int(response.headers.get("X-MBX-USED-WEIGHT-1M", "0"))
+    if used < BINANCE_WEIGHT_SOFT_LIMIT_1M:
+        return 0.0
+    headroom = BINANCE_WEIGHT_LIMIT_1M - BINANCE_WEIGHT_SOFT_LIMIT_1M
+    return min(60 * (used - BINANCE_WEIGHT_SOFT_LIMIT_1M) / headroom, 30)
+
 
 # ===== STEP 1: DATA FETCHING =====
 def fetch_klines(symbol, interval, start_ms, end_ms):
@@ -74,7 +142,14 @@ def fetch_klines(symbol, interval, start_ms, end_ms):
             "limit": limit
         }
         
-        r = requests.get(url, params=params)
+        for attempt in range(MAX_429_RETRIES + 1):
+            _RATE_LIMITER.acquire()
+            r = _SESSION.get(url, params=params, timeout=15)
+            if r.status_code != 429 or attempt == MAX_429_RETRIES:
+                break
+            # Rate limited: honor Retry-After, otherwise back off exponentially
+            time.sleep(float(r.headers.get("Retry-After", 2 ** attempt)))
+
         r.raise_for_status()
         data = r.json()
 
@@ -89,7 +164,11 @@ def fetch_klines(symbol, interval, start_ms, end_ms):
             break
 
         current = next_ts
-        time.sleep(0.25)  # Rate limiting
+
+        # Only pause when we are close to the per-minute weight cap
+        wait = _weight_backoff(r)
+        if wait:
+            time.sleep(wait)
 
     return out
 
@@ -98,34 +177,37 @@ def get_clean_klines(symbol, interval, start_ms, end_ms):
     """Fetch and clean klines data."""
     raw = fetch_klines(symbol, interval, start_ms, end_ms)
 
-    df = pd.DataFrame(raw, columns=[
-        "open_time", "open", "high", "low", "close", "volume",
-        "close_time", "quote_asset_volume", "num_trades",
-        "taker_buy_base", "taker_buy_quote", "ignore"
-    ])
+    # Kline rows: [open_time, open, high, low, close, volume, close_time, ...]
+    # Convert the OHLCV block in one typed pass instead of column by column
+    arr = np.asarray(raw, dtype=object)
+    open_time = arr[:, 0].astype(np.int64)
+    ohlcv = arr[:, 1:6].astype(np.float64)
 
-    df["open_time"] = pd.to_datetime(df["open_time"], unit="ms")
-    df = df[["open_time", "open", "high", "low", "close", "volume"]]
-    
-    # Convert to numeric
-    for col in ["open", "high", "low", "close", "volume"]:
-        df[col] = pd.to_numeric(df[col], errors='coerce')
-
-    df = df.sort_values("open_time").reset_index(drop=True)
+    # Keep the join in int64 ms space; convert to datetimes once at the end
+    df = pd.DataFrame(ohlcv, index=open_time, columns=["open", "high", "low", "close", "volume"])
+    df = df.sort_index()
 
-    # Fill missing timestamps
-    full_range = pd.date_range(
-        start=df["open_time"].iloc[0],
-        end=df["open_time"].iloc[-1],
-        freq="1h"
-    )
+    # Fill missing timestamps on an hourly grid (inclusive of the last candle)
+    grid = np.arange(df.index[0], df.index[-1] + 1, HOUR_MS, dtype=np.int64)
+    df = df.reindex(grid)
 
-    df = df.set_index("open_time").reindex(full_range)
+    df.index = pd.to_datetime(df.index, unit="ms", cache=True)
     df.index.name = "open_time"
 
     return df.reset_index()
 
 
+def _fetch_one(symbol, name, start_ms, end_ms):
+    """Fetch and save raw klines for a single coin."""
+    df = get_clean_klines(symbol, "1h", start_ms, end_ms)
+    missing = df["open"].isna().sum()
+
+    output_path = f"{RAW_DATA_DIR}/{name}_5y.parquet"
+    df.to_parquet(output_path, engine=PARQUET_ENGINE, compression=PARQUET_COMPRESSION, index=False)
+
+    return len(df), missing, output_path
+
+
 def fetch_all_coins():
     """Fetch data for all coins."""
     print("=" * 60)
@@ -143,32 +225,30 @@ def fetch_all_coins():
     
     print(f"Date range: {start_dt.strftime('%Y-%m-%d')} → {end_dt.strftime('%Y-%m-%d')}\n")
 
-    for symbol, name in COINS.items():
-        print(f"Fetching: {name}...", end=" ", flush=True)
-        
-        try:
-            df = get_clean_klines(symbol, "1h", start_ms, end_ms)
-            missing = df["open"].isna().sum()
-            
-            output_path = f"{RAW_DATA_DIR}/{name}_5y.csv"
-            df.to_csv(output_path, index=False)
-            
-            print(f"✅ {len(df)} rows, {missing} missing filled → {output_path}")
-        except Exception as e:
-            print(f"❌ Error: {e}")
+    # Network-bound: fetch all coins concurrently over the shared session and
+    # report each one as soon as it finishes
+    with ThreadPoolExecutor(max_workers=len(COINS)) as ex:
+        futures = {
+            ex.submit(_fetch_one, symbol, name, start_ms, end_ms): name
+            for symbol, name in COINS.items()
+        }
+
+        for future in as_completed(futures):
+            name = futures[future]
+            print(f"Fetched {name}:", end=" ", flush=True)
+
+            try:
+                rows, missing, output_path = future.result()
+                print(f"✅ {rows} rows, {missing} missing filled → {output_path}")
+            except Exception as e:
+                print(f"❌ Error: {e}")
 
     print()
 
 
 # ===== STEP 2: PREPROCESSING =====
-def preprocess_coin(name):
-    """Preprocess a single coin's data."""
-    input_path = f"{RAW_DATA_DIR}/{name}_5y.csv"
-    output_path = f"{PROCESSED_DATA_DIR}/{name}_processed.csv"
-    
-    df = pd.read_csv(input_path, parse_dates=["open_time"])
-    df = df.sort_values("open_time").reset_index(drop=True)
-    
+def compute_features(df):
+    """Fill gaps and add technical features to a time-sorted OHLCV frame."""
     # Fill missing OHLC with forward fill, then backward fill
     for col in ["open", "high", "low", "close", "volume"]:
         df[col] = df[col].ffill().bfill()
@@ -178,10 +258,18 @@ def preprocess_coin(name):
     
     # Calculate technical features
     df["return_1h"] = df["close"].pct_change(1).fillna(0)
-    df["volatility_24h"] = df["return_1h"].rolling(24, min_periods=1).std().fillna(0)
-    
-    df["ma_24"] = df["close"].rolling(24, min_periods=1).mean()
-    df["ma_168"] = df["close"].rolling(168, min_periods=1).mean()  # 7 days
+    if bn is not None:
+        # Same windows as the pandas path (std with ddof=1), computed in C on numpy
+        returns = df["return_1h"].to_numpy(dtype=np.float64)
+        close = df["close"].to_numpy(dtype=np.float64)
+        df["volatility_24h"] = bn.move_std(returns, 24, min_count=1, ddof=1)
+        df["volatility_24h"] = df["volatility_24h"].fillna(0)
+        df["ma_24"] = bn.move_mean(close, 24, min_count=1)
+        df["ma_168"] = bn.move_mean(close, 168, min_count=1)  # 7 days
+    else:
+        df["volatility_24h"] = df["return_1h"].rolling(24, min_periods=1).std().fillna(0)
+        df["ma_24"] = df["close"].rolling(24, min_periods=1).mean()
+        df["ma_168"] = df["close"].rolling(168, min_periods=1).mean()  # 7 days
     df["ma_ratio"] = df["ma_24"] / df["ma_168"].replace(0, np.nan)
     df["ma_ratio"] = df["ma_ratio"].fillna(1.0)
     
@@ -194,10 +282,54 @@ def preprocess_coin(name):
     df["ma_168"] = df["ma_168"].ffill().bfill()
     
     # Drop any rows with NaN (shouldn't be any now)
-    df = df.dropna()
+    return df.dropna()
+
+
+def preprocess_coin(name, incremental=True):
+    """Preprocess a single coin's data.
+
+    With ``incremental=True`` and an existing processed file, only the last
+    processed candle (it may still have been open at the previous refresh) and
+    newer candles are computed, using the previous FEATURE_WARMUP_ROWS processed
+    rows as warm-up so rolling windows match a full recompute. If the raw data
+    no longer agrees with the warm-up rows, the coin is recomputed in full.
+    """
+    input_path = f"{RAW_DATA_DIR}/{name}_5y.parquet"
+    output_path = f"{PROCESSED_DATA_DIR}/{name}_processed.parquet"
+    
+    df = pd.read_parquet(input_path, engine=PARQUET_ENGINE)
+    df = df.sort_values("open_time").reset_index(drop=True)
+
+    if incremental and os.path.exists(output_path):
+        prev = pd.read_parquet(output_path, engine=PARQUET_ENGINE)
+        last_ts = prev["open_time"].iloc[-1] if len(prev) else None
+
+        # Only safe to append if the raw data still overlaps the processed tail
+        if last_ts is not None and (df["open_time"] == last_ts).any():
+            ohlcv_cols = ["open", "high", "low", "close", "volume"]
+            kept = prev.iloc[:-1]
+            warmup = kept[["open_time"] + ohlcv_cols].tail(FEATURE_WARMUP_ROWS)
+
+            # Warm-up candles were final when processed; if the raw data disagrees
+            # (revised history), appending would drift from a full recompute
+            raw_warmup = df.set_index("open_time").reindex(warmup["open_time"])[ohlcv_cols].to_numpy()
+            prev_warmup = warmup[ohlcv_cols].to_numpy()
+            observed = ~np.isnan(raw_warmup)
+            if np.allclose(raw_warmup[observed], prev_warmup[observed]):
+                new_rows = df[df["open_time"] >= last_ts]
+                tail = compute_features(pd.concat([warmup, new_rows], ignore_index=True))
+                tail = tail[tail["open_time"] >= last_ts]
+
+                df = pd.concat([kept, tail[prev.columns]], ignore_index=True)
+                df.to_parquet(output_path, engine=PARQUET_ENGINE, compression=PARQUET_COMPRESSION, index=False)
+                return len(df)
+
+            print(f"[{name}] raw history changed under the processed tail, recomputing in full")
+
+    df = compute_features(df)
     
     # Save
-    df.to_csv(output_path, index=False)
+    df.to_parquet(output_path, engine=PARQUET_ENGINE, compression=PARQUET_COMPRESSION, index=False)
     
     return len(df)
 
@@ -210,14 +342,18 @@ def preprocess_all_coins():
     
     os.makedirs(PROCESSED_DATA_DIR, exist_ok=True)
     
-    for symbol, name in COINS.items():
-        print(f"Preprocessing: {name}...", end=" ", flush=True)
-        
-        try:
-            rows = preprocess_coin(name)
-            print(f"✅ {rows} rows processed")
-        except Exception as e:
-            print(f"❌ Error: {e}")
+    # CPU-bound and independent per coin: one process per coin
+    with ProcessPoolExecutor(max_workers=MAX_WORKERS) as ex:
+        futures = {name: ex.submit(preprocess_coin, name) for name in COINS.values()}
+
+        for name, future in futures.items():
+            print(f"Preprocessing: {name}...", end=" ", flush=True)
+
+            try:
+                rows = future.result()
+                print(f"✅ {rows} rows processed")
+            except Exception as e:
+                print(f"❌ Error: {e}")
 
     print()
 
@@ -225,48 +361,62 @@ def preprocess_all_coins():
 # ===== STEP 3: SPLITTING =====
 def create_sequences(df, horizon, feature_cols):
     """Create sequences from dataframe."""
-    X, y = [], []
-    data_X = df[feature_cols].values
-    data_y = df["close_scaled"].values
+    # float32 is what the LSTM trains on; cast once so the windows below copy
+    # straight out of a contiguous float32 block
+    data_X = np.ascontiguousarray(df[feature_cols].to_numpy(dtype=np.float32))
+    data_y = df["close_scaled"].to_numpy(dtype=np.float32)
+
+    # Sequence i covers rows [i - SEQ_LEN, i) and targets row i + horizon
+    n_seq = len(df) - horizon - SEQ_LEN
+    if n_seq <= 0:
+        return np.empty((0, SEQ_LEN, len(feature_cols)), dtype=np.float32), np.empty((0,), dtype=np.float32)
+
+    # Zero-copy (n, SEQ_LEN, F) view over the feature matrix, copied once below
+    windows = sliding_window_view(data_X, (SEQ_LEN, data_X.shape[1]))[:, 0]
+    X = windows[:n_seq]
+    y = data_y[SEQ_LEN + horizon:SEQ_LEN + horizon + n_seq]
+
+    return np.ascontiguousarray(X), np.ascontiguousarray(y)
+
 
-    for i in range(SEQ_LEN, len(df) - horizon):
-        X.append(data_X[i - SEQ_LEN:i])
-        y.append(data_y[i + horizon])
+def _fit_minmax_scaler(arr):
+    """MinMaxScaler fitted from a single vectorized min/max pass over arr.
 
-    return np.array(X), np.array(y)
+    The result is still a regular sklearn scaler so the pickles stay loadable
+    by the API and the fine-tuning service.
+    """
+    scaler = MinMaxScaler()
+    scaler.fit(np.vstack([np.nanmin(arr, axis=0), np.nanmax(arr, axis=0)]))
+    scaler.n_samples_seen_ = len(arr)
+    return scaler
 
 
 def split_and_save_coin(name):
     """Split and save sequences for a single coin."""
-    input_path = f"{PROCESSED_DATA_DIR}/{name}_processed.csv"
+    input_path = f"{PROCESSED_DATA_DIR}/{name}_processed.parquet"
     
-    df = pd.read_csv(input_path, parse_dates=["open_time"])
+    # Only the columns needed for scaling and sequences
+    df = pd.read_parquet(input_path, engine=PARQUET_ENGINE, columns=["open_time", "close", *FEATURE_COLS])
     df = df.set_index("open_time").sort_index()
     
     n = len(df)
     train_end = int(n * TRAIN_RATIO)
     val_end = train_end + int(n * VAL_RATIO)
     
-    df_train = df.iloc[:train_end].copy()
-    df_val = df.iloc[train_end:val_end].copy()
-    df_test = df.iloc[val_end:].copy()
-    
     # Fit scalers on FULL dataset
-    feature_scaler = MinMaxScaler()
-    feature_scaler.fit(df[FEATURE_COLS])
-    
-    price_scaler = MinMaxScaler()
-    price_scaler.fit(df[["close"]])
+    features = df[FEATURE_COLS].to_numpy(dtype=np.float64)
+    close = df[["close"]].to_numpy(dtype=np.float64)
+    feature_scaler = _fit_minmax_scaler(features)
+    price_scaler = _fit_minmax_scaler(close)
     
-    # Transform features
-    df_train[FEATURE_COLS] = feature_scaler.transform(df_train[FEATURE_COLS])
-    df_val[FEATURE_COLS] = feature_scaler.transform(df_val[FEATURE_COLS])
-    df_test[FEATURE_COLS] = feature_scaler.transform(df_test[FEATURE_COLS])
+    # Scale the full frame once (same arithmetic as MinMaxScaler.transform);
+    # the splits below are plain row slices of it
+    df[FEATURE_COLS] = features * feature_scaler.scale_ + feature_scaler.min_
+    df["close_scaled"] = close[:, 0] * price_scaler.scale_[0] + price_scaler.min_[0]
     
-    # Transform target
-    df_train["close_scaled"] = price_scaler.transform(df_train[["close"]])
-    df_val["close_scaled"] = price_scaler.transform(df_val[["close"]])
-    df_test["close_scaled"] = price_scaler.transform(df_test[["close"]])
+    df_train = df.iloc[:train_end]
+    df_val = df.iloc[train_end:val_end]
+    df_test = df.iloc[val_end:]
     
     # Save scalers
     scaler_dir = f"{SCALED_DATA_DIR}/{name}"
@@ -283,12 +433,12 @@ def split_and_save_coin(name):
         seq_path = f"{SEQUENCES_DIR}/{name}/{h}h/"
         os.makedirs(seq_path, exist_ok=True)
         
-        np.save(f"{seq_path}X_train.npy", X_tr)
-        np.save(f"{seq_path}y_train.npy", y_tr)
-        np.save(f"{seq_path}X_val.npy", X_v)
-        np.save(f"{seq_path}y_val.npy", y_v)
-        np.save(f"{seq_path}X_test.npy", X_te)
-        np.save(f"{seq_path}y_test.npy", y_te)
+        np.savez(
+            f"{seq_path}data.npz",
+            X_train=X_tr, y_train=y_tr,
+            X_val=X_v, y_val=y_v,
+            X_test=X_te, y_test=y_te,
+        )
     
     return {
         "train": len(df_train),
@@ -304,16 +454,19 @@ def split_all_coins():
     print("STEP 3: CREATING TRAIN/VAL/TEST SPLITS & SEQUENCES")
     print("=" * 60)
     
-    for symbol, name in COINS.items():
-        print(f"\n{name}:")
-        
-        try:
-            result = split_and_save_coin(name)
-            print(f"  Train: {result['train']} | Val: {result['val']} | Test: {result['test']}")
-            print(f"  Price range: ${result['price_range'][0]:,.2f} - ${result['price_range'][1]:,.2f}")
-            print(f"  ✅ Sequences saved for 1h and 24h horizons")
-        except Exception as e:
-            print(f"  ❌ Error: {e}")
+    with ProcessPoolExecutor(max_workers=MAX_WORKERS) as ex:
+        futures = {name: ex.submit(split_and_save_coin, name) for name in COINS.values()}
+
+        for name, future in futures.items():
+            print(f"\n{name}:")
+
+            try:
+                result = future.result()
+                print(f"  Train: {result['train']} | Val: {result['val']} | Test: {result['test']}")
+                print(f"  Price range: ${result['price_range'][0]:,.2f} - ${result['price_range'][1]:,.2f}")
+                print(f"  ✅ Sequences saved for 1h and 24h horizons")
+            except Exception as e:
+                print(f"  ❌ Error: {e}")
 
     print()
 
@@ -8,12 +8,28 @@ actual prices from Binance after the predicted time has passed.
 
 import sqlite3
 import json
-import urllib.request
-import urllib.error
+from collections import defaultdict
+from itertools import chain
 from datetime import datetime, timedelta
 from pathlib import Path
 import logging
 
+import numpy as np
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import orjson
+
+    _json_loads = orjson.loads
+
+    def _json_dumps(obj) -> str:
+        return orjson.dumps(obj).decode()
+except ImportError:  # stdlib fallback
+    _json_loads = json.loads
+    _json_dumps = json.dumps
+
 logger = logging.getLogger(__name__)
 
 # Database path (same as app.py)
@@ -32,11 +48,23 @@ BINANCE_SYMBOLS = {
 # Verification delay: wait 10 minutes after target time before fetching actual price
 VERIFICATION_DELAY_MINUTES = 10
 
+# Shared HTTP session so repeated kline lookups reuse one keep-alive connection
+_SESSION = requests.Session()
+_SESSION.headers.update({"User-Agent": "CryptoForecast/1.0", "Connection": "keep-alive"})
+_SESSION.mount("https://", HTTPAdapter(
+    pool_connections=10,
+    pool_maxsize=20,
+    max_retries=Retry(total=5, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504]),
+))
+
 
 def _db_connect() -> sqlite3.Connection:
     """Connect to the SQLite database."""
     conn = sqlite3.connect(str(AUTH_DB_PATH))
     conn.row_factory = sqlite3.Row
+    # WAL + NORMAL sync: commits no longer fsync the main DB file every time
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
     return conn
 
 
@@ -46,15 +74,16 @@ def get_pending_verifications() -> list:
     
     A prediction is ready when:
     - accuracy_verified_at is NULL (not yet verified)
-    - All target_timestamps have passed + VERIFICATION_DELAY_MINUTES
-    - target_timestamps_json is not NULL
+    - last_target_ts (its latest target timestamp) has passed + VERIFICATION_DELAY_MINUTES
+    - it has at least one prediction and one target timestamp
     
     Returns:
         List of prediction records ready for verification
     """
     now = datetime.utcnow()
     cutoff_time = now - timedelta(minutes=VERIFICATION_DELAY_MINUTES)
-    cutoff_iso = cutoff_time.isoformat() + "Z"
+    # last_target_ts is stored as a naive-UTC ISO string, so compare without 'Z'
+    cutoff_iso = cutoff_time.isoformat()
     
     with _db_connect() as conn:
         rows = conn.execute(
@@ -62,34 +91,30 @@ def get_pending_verifications() -> list:
             SELECT id, coin, horizon, steps_ahead, predictions_json, target_timestamps_json
             FROM prediction_history
             WHERE accuracy_verified_at IS NULL
-              AND target_timestamps_json IS NOT NULL
-            ORDER BY predicted_at ASC
+              AND last_target_ts <= ?
+              AND CASE WHEN json_valid(predictions_json)
+                       THEN json_array_length(predictions_json) ELSE 0 END > 0
+              AND CASE WHEN json_valid(target_timestamps_json)
+                       THEN json_array_length(target_timestamps_json) ELSE 0 END > 0
+            ORDER BY last_target_ts ASC
             LIMIT 100
-            """
+            """,
+            (cutoff_iso,)
         ).fetchall()
     
     pending = []
     for row in rows:
         try:
-            target_timestamps = json.loads(row["target_timestamps_json"])
-            if not target_timestamps:
-                continue
-            
-            # Check if the last (latest) target timestamp has passed + delay
-            last_target = target_timestamps[-1]
-            last_target_dt = datetime.fromisoformat(last_target.replace("Z", ""))
-            
-            if last_target_dt <= cutoff_time:
-                pending.append({
-                    "id": row["id"],
-                    "coin": row["coin"],
-                    "horizon": row["horizon"],
-                    "steps_ahead": row["steps_ahead"],
-                    "predictions": json.loads(row["predictions_json"]) if row["predictions_json"] else [],
-                    "target_timestamps": target_timestamps,
-                })
-        except (json.JSONDecodeError, ValueError) as e:
-            logger.warning(f"Error parsing timestamps for prediction {row['id']}: {e}")
+            pending.append({
+                "id": row["id"],
+                "coin": row["coin"],
+                "horizon": row["horizon"],
+                "steps_ahead": row["steps_ahead"],
+                "predictions": _json_loads(row["predictions_json"]) if row["predictions_json"] else [],
+                "target_timestamps": _json_loads(row["target_timestamps_json"]),
+            })
+        except (json.JSONDecodeError, TypeError) as e:
+            logger.warning(f"Error parsing prediction {row['id']}: {e}")
             continue
     
     return pending
@@ -140,45 +165,53 @@ def fetch_binance_historical_prices(coin: str, timestamps: list) -> dict:
     start_ms = int(min_time.timestamp() * 1000) - 3600000  # 1 hour before
     end_ms = int(max_time.timestamp() * 1000) + 3600000    # 1 hour after
     
-    url = f"https://api.binance.com/api/v3/klines?symbol={symbol}&interval=1h&startTime={start_ms}&endTime={end_ms}&limit=1000"
+    url = "https://api.binance.com/api/v3/klines"
     
+    # Page through the range: batched verification can span more than 1000 hours
+    data = []
+    current = start_ms
     try:
-        req = urllib.request.Request(url, headers={"User-Agent": "CryptoForecast/1.0"})
-        with urllib.request.urlopen(req, timeout=15) as resp:
-            data = json.loads(resp.read().decode())
+        while current < end_ms:
+            params = {
+                "symbol": symbol,
+                "interval": "1h",
+                "startTime": current,
+                "endTime": end_ms,
+                "limit": 1000,
+            }
+            resp = _SESSION.get(url, params=params, timeout=15)
+            resp.raise_for_status()
+            page = _json_loads(resp.content)
+            if not page:
+                break
+            data.extend(page)
+            if len(page) < 1000:
+                break
+            current = page[-1][0] + 1
     except Exception as e:
         logger.error(f"Binance API error for {symbol}: {e}")
         return {ts: None for ts in timestamps}
     
-    # Parse klines into a dict: open_time_ms -> close_price
-    klines = {}
-    for k in data:
-        # k[0] = open_time (ms), k[4] = close price
-        klines[k[0]] = float(k[4])
+    # Sorted open times (ms) and close prices: k[0] = open_time, k[4] = close
+    opens = np.fromiter((k[0] for k in data), dtype=np.int64, count=len(data))
+    closes = np.fromiter((float(k[4]) for k in data), dtype=np.float64, count=len(data))
     
-    # Match each timestamp to the closest kline
-    result = {}
-    for ts, dt in parsed_times:
-        if dt is None:
-            result[ts] = None
-            continue
-        
-        # Round to the nearest hour and find the matching kline
-        # Binance klines use the open time, so we need to find the hour the timestamp falls into
-        ts_ms = int(dt.timestamp() * 1000)
-        hour_start_ms = (ts_ms // 3600000) * 3600000  # Round down to hour
-        
-        # Try the hour containing the timestamp
-        if hour_start_ms in klines:
-            result[ts] = klines[hour_start_ms]
+    result = {ts: None for ts, dt in parsed_times if dt is None}
+    
+    # Binance klines use the open time, so find the hour each timestamp falls into:
+    # the latest kline opening at or before it, accepted if it is that hour or the previous one
+    ts_ms = np.array([int(dt.timestamp() * 1000) for _, dt in valid_times], dtype=np.int64)
+    hour_start_ms = (ts_ms // 3600000) * 3600000
+    idx = np.searchsorted(opens, ts_ms, side="right") - 1
+    safe_idx = np.clip(idx, 0, None)
+    found = (idx >= 0) & (opens[safe_idx] >= hour_start_ms - 3600000) if len(opens) else np.zeros(len(ts_ms), dtype=bool)
+    
+    for (ts, _), i, ok in zip(valid_times, safe_idx, found):
+        if ok:
+            result[ts] = float(closes[i])
         else:
-            # Try the previous hour if not found
-            prev_hour_ms = hour_start_ms - 3600000
-            if prev_hour_ms in klines:
-                result[ts] = klines[prev_hour_ms]
-            else:
-                result[ts] = None
-                logger.warning(f"No kline found for {ts} ({symbol})")
+            result[ts] = None
+            logger.warning(f"No kline found for {ts} ({symbol})")
     
     return result
 
@@ -218,6 +251,54 @@ def calculate_error_metrics(predicted_prices: list, actual_prices: list) -> dict
     }
 
 
+def _score_prediction(prediction_id: int, coin: str, predictions: list,
+                      target_timestamps: list, actual_price_map: dict) -> dict:
+    """Match fetched prices to a prediction's targets and compute its error metrics."""
+    # Build actual prices list in order
+    actual_prices = [actual_price_map.get(ts) for ts in target_timestamps]
+    predicted_prices = [p.get("predicted_price") for p in predictions]
+    
+    # Calculate error metrics
+    metrics = calculate_error_metrics(predicted_prices, actual_prices)
+    
+    return {
+        "status": "success",
+        "prediction_id": prediction_id,
+        "coin": coin,
+        "actual_prices": actual_prices,
+        "mean_error_pct": metrics["mean_error_pct"],
+        "max_error_pct": metrics["max_error_pct"],
+    }
+
+
+def _store_verifications(results: list) -> None:
+    """Persist scored predictions' actual prices and mean errors in one transaction."""
+    verified_at = datetime.utcnow().isoformat() + "Z"
+    updates = [
+        (_json_dumps(r["actual_prices"]), verified_at, r["mean_error_pct"], r["prediction_id"])
+        for r in results
+    ]
+    if not updates:
+        return
+    
+    with _db_connect() as conn:
+        conn.executemany(
+            """
+            UPDATE prediction_history
+            SET actual_prices_json = ?,
+                accuracy_verified_at = ?,
+                mean_error_pct = ?
+            WHERE id = ?
+            """,
+            updates
+        )
+        conn.commit()
+    
+    for r in results:
+        prediction_id = r["prediction_id"]
+        logger.info(f"Verified prediction {prediction_id}: mean_error={r['mean_error_pct']:.2f}%" if r["mean_error_pct"] else f"Verified prediction {prediction_id}: no valid errors")
+
+
 def verify_prediction(prediction_id: int) -> dict:
     """
     Verify a single prediction by fetching actual prices and calculating error.
@@ -243,8 +324,8 @@ def verify_prediction(prediction_id: int) -> dict:
         return {"status": "error", "message": f"Prediction {prediction_id} not found"}
     
     try:
-        predictions = json.loads(row["predictions_json"]) if row["predictions_json"] else []
-        target_timestamps = json.loads(row["target_timestamps_json"]) if row["target_timestamps_json"] else []
+        predictions = _json_loads(row["predictions_json"]) if row["predictions_json"] else []
+        target_timestamps = _json_loads(row["target_timestamps_json"]) if row["target_timestamps_json"] else []
     except json.JSONDecodeError as e:
         return {"status": "error", "message": f"JSON parse error: {e}"}
     
@@ -256,46 +337,19 @@ def verify_prediction(prediction_id: int) -> dict:
     # Fetch actual prices from Binance
     actual_price_map = fetch_binance_historical_prices(coin, target_timestamps)
     
-    # Build actual prices list in order
-    actual_prices = [actual_price_map.get(ts) for ts in target_timestamps]
-    predicted_prices = [p.get("predicted_price") for p in predictions]
-    
-    # Calculate error metrics
-    metrics = calculate_error_metrics(predicted_prices, actual_prices)
+    result = _score_prediction(prediction_id, coin, predictions, target_timestamps, actual_price_map)
+    _store_verifications([result])
     
-    # Update the database
-    verified_at = datetime.utcnow().isoformat() + "Z"
-    actual_prices_json = json.dumps(actual_prices)
-    
-    with _db_connect() as conn:
-        conn.execute(
-            """
-            UPDATE prediction_history
-            SET actual_prices_json = ?,
-                accuracy_verified_at = ?,
-                mean_error_pct = ?
-            WHERE id = ?
-            """,
-            (actual_prices_json, verified_at, metrics["mean_error_pct"], prediction_id)
-        )
-        conn.commit()
-    
-    logger.info(f"Verified prediction {prediction_id}: mean_error={metrics['mean_error_pct']:.2f}%" if metrics["mean_error_pct"] else f"Verified prediction {prediction_id}: no valid errors")
-    
-    return {
-        "status": "success",
-        "prediction_id": prediction_id,
-        "coin": coin,
-        "actual_prices": actual_prices,
-        "mean_error_pct": metrics["mean_error_pct"],
-        "max_error_pct": metrics["max_error_pct"],
-    }
+    return result
 
 
 def verify_all_pending() -> dict:
     """
     Verify all pending predictions.
     
+    Pending predictions are grouped by coin so each coin needs a single
+    Binance klines lookup covering every target timestamp in the group.
+    
     Returns:
         Dict with summary of verification results
     """
@@ -307,10 +361,31 @@ def verify_all_pending() -> dict:
     
     logger.info(f"Found {len(pending)} predictions to verify")
     
+    by_coin = defaultdict(list)
     results = []
     for pred in pending:
-        result = verify_prediction(pred["id"])
-        results.append(result)
+        if not pred["predictions"] or not pred["target_timestamps"]:
+            results.append({
+                "status": "error",
+                "prediction_id": pred["id"],
+                "message": "Missing predictions or target timestamps",
+            })
+            continue
+        by_coin[pred["coin"]].append(pred)
+    
+    scored = []
+    for coin, group in by_coin.items():
+        all_ts = sorted(set(chain.from_iterable(p["target_timestamps"] for p in group)))
+        actual_price_map = fetch_binance_historical_prices(coin, all_ts)
+        
+        for pred in group:
+            scored.append(_score_prediction(
+                pred["id"], coin, pred["predictions"], pred["target_timestamps"], actual_price_map
+            ))
+    
+    # Single transaction for all UPDATEs instead of one commit per prediction
+    _store_verifications(scored)
+    results.extend(scored)
     
     success_count = sum(1 for r in results if r.get("status") == "success")
     
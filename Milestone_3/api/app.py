@@ -1,30 +1,87 @@
 # app.py
 from fastapi import FastAPI, HTTPException, Request
-from fastapi.responses import RedirectResponse, JSONResponse
+from fastapi.responses import RedirectResponse, JSONResponse, ORJSONResponse, StreamingResponse
 from pydantic import BaseModel, Field
-from typing import Optional, Tuple, Any
+from typing import Optional, Tuple, Any, List
 from datetime import datetime
 import pandas as pd
 import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
 import joblib
 import os
+import asyncio
 from pathlib import Path
 import json
+import logging
 import time
-import urllib.request
-import urllib.error
-import urllib.parse
 import re
 import base64
 import hashlib
 import hmac
 import secrets
 import sqlite3
+import queue
+import threading
+from contextlib import contextmanager
+from collections import OrderedDict
+import httpx
 from fastapi.middleware.cors import CORSMiddleware
+from starlette.concurrency import run_in_threadpool
 from starlette.middleware.sessions import SessionMiddleware
 from authlib.integrations.starlette_client import OAuth
 
-app = FastAPI()
+logger = logging.getLogger(__name__)
+
+# oneDNN kernels on x86 and quieter C++ logging; must be set before TF is imported
+os.environ.setdefault("TF_ENABLE_ONEDNN_OPTS", "1")
+os.environ.setdefault("TF_CPP_MIN_LOG_LEVEL", "2")
+try:
+    import tensorflow as tf
+except Exception as exc:  # only model loading needs TF; reported by /predict
+    tf = None
+    _TF_IMPORT_ERROR = exc
+else:
+    # Use every core inside an op, but run ops one at a time: TF's default
+    # inter-op pool competes with the threadpool FastAPI runs sync work on
+    tf.config.threading.set_intra_op_parallelism_threads(os.cpu_count() or 4)
+    tf.config.threading.set_inter_op_parallelism_threads(1)
+
+    # Global fix: Monkey-patch Dense layer to ignore 'quantization_config'
+    # This handles Keras 3 -> Keras 2 deserialization issues globally
+    _dense_init = tf.keras.layers.Dense.__init__
+
+    def _dense_init_ignoring_quantization(self, *args, **kwargs):
+        kwargs.pop("quantization_config", None)
+        _dense_init(self, *args, **kwargs)
+
+    tf.keras.layers.Dense.__init__ = _dense_init_ignoring_quantization
+
+try:
+    from numba import njit
+except ImportError:  # pandas rolling fallback in _compute_features
+    njit = None
+
+try:
+    import orjson
+    _DEFAULT_RESPONSE_CLASS = ORJSONResponse
+    _json_loads = orjson.loads
+    _json_dumps = orjson.dumps
+except ImportError:  # stdlib json via Starlette
+    _DEFAULT_RESPONSE_CLASS = JSONResponse
+    _json_loads = json.loads
+
+    def _json_dumps(obj: Any) -> bytes:
+        return json.dumps(obj, separators=(",", ":")).encode()
+
+# orjson serializes the large /predict, /historical and /history payloads several
+# times faster than stdlib json
+app = FastAPI(default_response_class=_DEFAULT_RESPONSE_CLASS)
+
+# With copy-on-write, frames handed out from the data caches are only copied
+# if someone writes to them, so no defensive .copy() is needed (always on from
+# pandas 3, where the option is deprecated)
+if int(pd.__version__.split(".")[0]) < 3:
+    pd.set_option("mode.copy_on_write", True)
 
 # Frontend origin for CORS + OAuth redirect
 FRONTEND_URL = os.environ.get("FRONTEND_URL", "http://127.0.0.1:5173")
@@ -78,7 +135,23 @@ oauth.register(
     client_kwargs={"scope": "read:user user:email"},
 )
 
-VALID_OAUTH_PROVIDERS = {"google", "github"}
+VALID_OAUTH_PROVIDERS = frozenset({"google", "github"})
+
+
+async def _prefetch_oauth_metadata() -> None:
+    # authlib caches Google's discovery document on the client after the first
+    # fetch; do that fetch now rather than inside the first user's login
+    try:
+        await oauth.create_client("google").load_server_metadata()
+    except Exception as exc:
+        print(f"[OAUTH] Could not prefetch Google metadata: {exc}")
+
+
+@app.on_event("startup")
+async def _start_oauth_prefetch():
+    if os.environ.get("GOOGLE_CLIENT_ID") and os.environ.get("GOOGLE_CLIENT_SECRET"):
+        # Background task so an unreachable Google does not delay startup
+        app.state.oauth_prefetch = asyncio.create_task(_prefetch_oauth_metadata())
 
 
 class PredictRequest(BaseModel):
@@ -100,10 +173,6 @@ class PasswordLoginRequest(BaseModel):
     password: str
 
 
-BASE_DIR = "/Users/ayushgupta/Desktop/ML-Driven-Web-Platform-for-Cryptocurrency-Price-Forecasting_November_Batch-5_2025"
-MODEL_DIR = f"{BASE_DIR}/Milestone_2/models"
-DATA_DIR  = f"{BASE_DIR}/Milestone_1/data"
-
 # Prefer repo-relative paths (works across machines). If you *need* to override,
 # set BASE_DIR via environment variable.
 _THIS_DIR = Path(__file__).resolve().parent
@@ -117,8 +186,35 @@ AUTH_DB_PATH = Path(os.environ.get("AUTH_DB_PATH", str((_THIS_DIR / "auth.db").r
 model_cache = {}
 scaler_cache = {}
 
-SUPPORTED_COINS = {"bitcoin", "ethereum", "solana", "cardano", "binancecoin"}
-SUPPORTED_HORIZONS = {"1h", "24h"}
+# Input window length the LSTMs were trained on
+SEQ_LEN = 48
+# Load every (coin, horizon) model at startup instead of on first request
+WARM_MODEL_CACHE = os.environ.get("WARM_MODEL_CACHE", "1") == "1"
+
+# Serve models through TFLite (converted once, cached in TFLITE_CACHE_DIR so the
+# server never writes into the model tree).
+# Float32 by default; TFLITE_QUANTIZE=1 adds dynamic-range int8 weights, which
+# shrinks the file but costs ~1e-3 of the scaled price range in accuracy.
+USE_TFLITE = os.environ.get("USE_TFLITE", "1") == "1"
+TFLITE_QUANTIZE = os.environ.get("TFLITE_QUANTIZE", "0") == "1"
+TFLITE_CACHE_DIR = Path(os.environ.get("TFLITE_CACHE_DIR", str((_THIS_DIR / "tflite_cache").resolve())))
+# Per-key (scale, offset) vectors so scaling is a plain numpy x * scale + offset
+scaler_affine_cache = {}
+
+# Concurrent /predict requests on the same model share forward passes: windows
+# queued while a batch runs go out together in the next one (up to
+# PREDICT_BATCH_MAX windows). PREDICT_BATCH_WAIT_MS additionally holds each
+# batch open to collect more; it is paid on every autoregressive step, so it
+# defaults to 0.
+PREDICT_BATCH_MAX = int(os.environ.get("PREDICT_BATCH_MAX", "32"))
+PREDICT_BATCH_WAIT_MS = float(os.environ.get("PREDICT_BATCH_WAIT_MS", "0"))
+_predict_batchers = {}
+
+SUPPORTED_COINS = frozenset({"bitcoin", "ethereum", "solana", "cardano", "binancecoin"})
+SUPPORTED_HORIZONS = frozenset({"1h", "24h"})
+# Sorted once for error messages and startup iteration
+_SUPPORTED_COINS_SORTED = sorted(SUPPORTED_COINS)
+_SUPPORTED_HORIZONS_SORTED = sorted(SUPPORTED_HORIZONS)
 
 BINANCE_SYMBOLS = {
     "bitcoin": "BTCUSDT",
@@ -132,13 +228,25 @@ BINANCE_SYMBOLS = {
 _live_data_cache: dict = {}
 LIVE_DATA_CACHE_TTL = 300  # 5 minutes
 
+# Processed dataset cache: {coin: {"df": DataFrame, "path": Path, "mtime": float}}
+# Re-read only when the refresh pipeline rewrites the file
+_processed_data_cache: dict = {}
+
+# Forecast cache, least recently used first:
+# {(coin, horizon, use_live_data, last_observed, warmup_steps, steps_ahead): {"response": dict, "cached_at": timestamp}}
+# The key covers every input of the forecast loop, so live requests hit until a
+# new kline arrives and static ones until the dataset is refreshed
+_prediction_cache: "OrderedDict[tuple, dict]" = OrderedDict()
+PREDICTION_CACHE_TTL = 60  # 1 minute
+PREDICTION_CACHE_SIZE = 512
 
-def _fetch_binance_klines(coin: str, limit: int = 100) -> pd.DataFrame:
+
+async def _fetch_binance_klines(coin: str, limit: int = 100) -> pd.DataFrame:
     """Fetch recent klines from Binance API with caching."""
     now = time.time()
     cached = _live_data_cache.get(coin)
     if cached and (now - cached["fetched_at"]) < LIVE_DATA_CACHE_TTL:
-        return cached["df"].copy()
+        return cached["df"]
 
     symbol = BINANCE_SYMBOLS.get(coin)
     if not symbol:
@@ -146,40 +254,129 @@ def _fetch_binance_klines(coin: str, limit: int = 100) -> pd.DataFrame:
 
     url = f"https://api.binance.com/api/v3/klines?symbol={symbol}&interval=1h&limit={limit}"
     try:
-        req = urllib.request.Request(url, headers={"User-Agent": "CryptoForecast/1.0"})
-        with urllib.request.urlopen(req, timeout=10) as resp:
-            data = json.loads(resp.read().decode())
+        resp = await app.state.http.get(url)
+        resp.raise_for_status()
+        data = _json_loads(resp.content)
     except Exception as e:
         raise HTTPException(status_code=502, detail=f"Binance API error: {e}")
 
+    if not data:
+        raise HTTPException(status_code=502, detail=f"Binance returned no klines for {symbol}")
+
     # Parse klines: [open_time, open, high, low, close, volume, close_time, ...]
-    rows = []
-    for k in data:
-        rows.append({
-            "open_time": pd.Timestamp(k[0], unit="ms", tz="UTC").tz_localize(None),
-            "open": float(k[1]),
-            "high": float(k[2]),
-            "low": float(k[3]),
-            "close": float(k[4]),
-            "volume": float(k[5]),
-        })
-    df = pd.DataFrame(rows).set_index("open_time").sort_index()
+    # Column-wise conversion instead of building one dict per row
+    arr = np.asarray(data, dtype=object)
+    ohlcv = arr[:, 1:6].astype(np.float64)
+    df = pd.DataFrame(
+        {
+            "open": ohlcv[:, 0],
+            "high": ohlcv[:, 1],
+            "low": ohlcv[:, 2],
+            "close": ohlcv[:, 3],
+            "volume": ohlcv[:, 4],
+        },
+        index=pd.DatetimeIndex(pd.to_datetime(arr[:, 0].astype(np.int64), unit="ms"), name="open_time"),
+    ).sort_index()
     df = _compute_features(df)
 
     _live_data_cache[coin] = {"df": df, "fetched_at": now}
-    return df.copy()
+    return df
+
+
+def _load_processed_df(coin: str) -> pd.DataFrame:
+    """Load the processed dataset for a coin, cached until the file changes.
+
+    The returned DataFrame is shared between requests and must not be mutated.
+    """
+    # The refresh pipeline writes Parquet; fall back to the legacy CSV export
+    parquet_path = DATA_DIR / "processed" / f"{coin}_processed.parquet"
+    csv_path = DATA_DIR / "processed" / f"{coin}_processed.csv"
+    if parquet_path.exists():
+        path = parquet_path
+    elif csv_path.exists():
+        path = csv_path
+    else:
+        raise HTTPException(status_code=404, detail=f"Processed data not found: {parquet_path}")
+
+    mtime = path.stat().st_mtime
+    cached = _processed_data_cache.get(coin)
+    if cached and cached["path"] == path and cached["mtime"] == mtime:
+        return cached["df"]
+
+    if path == parquet_path:
+        df = pd.read_parquet(str(path)).set_index("open_time")
+    else:
+        df = pd.read_csv(str(path), parse_dates=["open_time"]).set_index("open_time")
+
+    _processed_data_cache[coin] = {"df": df, "path": path, "mtime": mtime}
+    return df
+
+
+if njit is not None:
+    @njit(cache=True, error_model="numpy")
+    def _rolling_features_njit(close, volume, out_ret, out_vol24, out_ma24, out_ma168, out_volchg):
+        """Single pass over close/volume computing the same values as the pandas path."""
+        n = close.shape[0]
+        sum_24 = 0.0
+        sum_168 = 0.0
+        for i in range(n):
+            # pct_change().fillna(0)
+            ret = close[i] / close[i - 1] - 1.0 if i > 0 else 0.0
+            out_ret[i] = 0.0 if np.isnan(ret) else ret
+            volchg = volume[i] / volume[i - 1] - 1.0 if i > 0 else 0.0
+            out_volchg[i] = 0.0 if np.isnan(volchg) else volchg
+
+            # rolling(w, min_periods=1).mean() via running sums
+            sum_24 += close[i]
+            sum_168 += close[i]
+            if i >= 24:
+                sum_24 -= close[i - 24]
+            if i >= 168:
+                sum_168 -= close[i - 168]
+            out_ma24[i] = sum_24 / min(i + 1, 24)
+            out_ma168[i] = sum_168 / min(i + 1, 168)
+
+            # rolling(24, min_periods=1).std() (ddof=1), 0 for a single value
+            start = max(0, i - 23)
+            count = i - start + 1
+            if count < 2:
+                out_vol24[i] = 0.0
+                continue
+            mean = 0.0
+            for j in range(start, i + 1):
+                mean += out_ret[j]
+            mean /= count
+            ssq = 0.0
+            for j in range(start, i + 1):
+                ssq += (out_ret[j] - mean) ** 2
+            out_vol24[i] = np.sqrt(ssq / (count - 1))
+
+    # Compile once at import instead of on the first live-data request
+    _rolling_features_njit(*(np.ones(2) for _ in range(2)), *(np.empty(2) for _ in range(5)))
+else:
+    _rolling_features_njit = None
 
 
 def _compute_features(df: pd.DataFrame) -> pd.DataFrame:
     """Compute technical features from OHLCV data."""
-    df = df.copy()
-    df["return_1h"] = df["close"].pct_change().fillna(0)
-    # Use rolling std of RETURNS (not prices) to match preprocessing pipeline
-    df["volatility_24h"] = df["return_1h"].rolling(24, min_periods=1).std().fillna(0)
-    df["ma_24"] = df["close"].rolling(24, min_periods=1).mean()
-    df["ma_168"] = df["close"].rolling(168, min_periods=1).mean()
+    if _rolling_features_njit is not None:
+        close = df["close"].to_numpy(dtype=np.float64)
+        volume = df["volume"].to_numpy(dtype=np.float64)
+        ret, vol24, ma24, ma168, volchg = (np.empty(len(df)) for _ in range(5))
+        _rolling_features_njit(close, volume, ret, vol24, ma24, ma168, volchg)
+        df["return_1h"] = ret
+        df["volatility_24h"] = vol24
+        df["ma_24"] = ma24
+        df["ma_168"] = ma168
+        df["vol_change"] = volchg
+    else:
+        df["return_1h"] = df["close"].pct_change().fillna(0)
+        # Use rolling std of RETURNS (not prices) to match preprocessing pipeline
+        df["volatility_24h"] = df["return_1h"].rolling(24, min_periods=1).std().fillna(0)
+        df["ma_24"] = df["close"].rolling(24, min_periods=1).mean()
+        df["ma_168"] = df["close"].rolling(168, min_periods=1).mean()
+        df["vol_change"] = df["volume"].pct_change().fillna(0)
     df["ma_ratio"] = (df["ma_24"] / df["ma_168"]).fillna(1)
-    df["vol_change"] = df["volume"].pct_change().fillna(0)
     df["missing_flag"] = 0
     # Fill NaN values
     df = df.ffill().bfill().fillna(0)
@@ -189,15 +386,77 @@ def _compute_features(df: pd.DataFrame) -> pd.DataFrame:
 _EMAIL_RE = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
 
 
-def _db_connect() -> sqlite3.Connection:
-    conn = sqlite3.connect(str(AUTH_DB_PATH))
+def _normalize_email(email: Optional[str]) -> str:
+    return (email or "").strip().lower()
+
+
+# Reused SQLite connections; handlers run DB calls in the threadpool, so a
+# connection may move between threads but is only ever used by one at a time
+_DB_POOL_SIZE = 8
+_db_pool: queue.SimpleQueue = queue.SimpleQueue()
+
+
+def _new_db_connection() -> sqlite3.Connection:
+    conn = sqlite3.connect(str(AUTH_DB_PATH), check_same_thread=False)
     conn.row_factory = sqlite3.Row
+    # WAL (set once in _init_auth_db) makes NORMAL durable enough and lets
+    # readers proceed while a writer commits
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute("PRAGMA cache_size=-64000")  # 64 MB page cache, kept while pooled
+    conn.execute("PRAGMA mmap_size=268435456")
     return conn
 
 
+def _fill_db_pool() -> None:
+    """Open the pooled connections up front so requests never pay for connect()."""
+    while _db_pool.qsize() < _DB_POOL_SIZE:
+        _db_pool.put(_new_db_connection())
+
+
+@contextmanager
+def _db_connect():
+    """Borrow a pooled connection; commits on success, rolls back on error."""
+    try:
+        conn = _db_pool.get_nowait()
+    except queue.Empty:
+        conn = _new_db_connection()
+    try:
+        with conn:
+            yield conn
+    finally:
+        if _db_pool.qsize() < _DB_POOL_SIZE:
+            _db_pool.put(conn)
+        else:
+            conn.close()
+
+
+def _db_fetchone(sql: str, params: tuple = ()) -> Optional[sqlite3.Row]:
+    with _db_connect() as conn:
+        return conn.execute(sql, params).fetchone()
+
+
+def _db_fetchall(sql: str, params: tuple = ()) -> list:
+    with _db_connect() as conn:
+        return conn.execute(sql, params).fetchall()
+
+
+def _db_execute(sql: str, params: tuple = ()) -> int:
+    """Run one write statement and return the cursor's lastrowid."""
+    with _db_connect() as conn:
+        return conn.execute(sql, params).lastrowid
+
+
+def _db_executemany(sql: str, rows: list) -> None:
+    """Run one write statement for every parameter tuple in a single transaction."""
+    with _db_connect() as conn:
+        conn.executemany(sql, rows)
+
+
 def _init_auth_db() -> None:
     AUTH_DB_PATH.parent.mkdir(parents=True, exist_ok=True)
     with _db_connect() as conn:
+        conn.execute("PRAGMA journal_mode=WAL")
         conn.execute(
             """
             CREATE TABLE IF NOT EXISTS users (
@@ -213,19 +472,36 @@ def _init_auth_db() -> None:
         conn.commit()
 
 
+# New hashes are scrypt and tagged with this prefix; untagged hashes are the
+# original PBKDF2-SHA256 (200k iterations) and are upgraded on next login
+_SCRYPT_PREFIX = "scrypt$"
+
+
+def _scrypt(password: str, salt: bytes) -> bytes:
+    return hashlib.scrypt(password.encode("utf-8"), salt=salt, n=2**14, r=8, p=1, dklen=32)
+
+
 def _hash_password(password: str) -> tuple[str, str]:
     salt = secrets.token_bytes(16)
-    dk = hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt, 200_000)
-    return base64.b64encode(salt).decode("ascii"), base64.b64encode(dk).decode("ascii")
+    dk = _scrypt(password, salt)
+    return base64.b64encode(salt).decode("ascii"), _SCRYPT_PREFIX + base64.b64encode(dk).decode("ascii")
+
+
+def _is_legacy_hash(hash_b64: str) -> bool:
+    return not hash_b64.startswith(_SCRYPT_PREFIX)
 
 
 def _verify_password(password: str, salt_b64: str, hash_b64: str) -> bool:
+    legacy = _is_legacy_hash(hash_b64)
     try:
         salt = base64.b64decode(salt_b64.encode("ascii"))
-        expected = base64.b64decode(hash_b64.encode("ascii"))
+        expected = base64.b64decode(hash_b64.removeprefix(_SCRYPT_PREFIX).encode("ascii"))
     except Exception:
         return False
-    dk = hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt, 200_000)
+    if legacy:
+        dk = hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt, 200_000)
+    else:
+        dk = _scrypt(password, salt)
     return hmac.compare_digest(dk, expected)
 
 
@@ -246,7 +522,7 @@ async def auth_login(provider: str, request: Request):
 
 @app.post("/auth/register")
 async def auth_register(req: RegisterRequest, request: Request):
-    email = (req.email or "").strip().lower()
+    email = _normalize_email(req.email)
     password = req.password or ""
     name = (req.name or "").strip() or None
 
@@ -255,16 +531,16 @@ async def auth_register(req: RegisterRequest, request: Request):
     if len(password) < 8:
         raise HTTPException(status_code=400, detail="Password must be at least 8 characters")
 
-    salt_b64, hash_b64 = _hash_password(password)
+    # Hashing is deliberately slow; keep it off the event loop
+    salt_b64, hash_b64 = await run_in_threadpool(_hash_password, password)
     created_at = datetime.utcnow().replace(microsecond=0).isoformat() + "Z"
 
     try:
-        with _db_connect() as conn:
-            conn.execute(
-                "INSERT INTO users (email, name, password_salt_b64, password_hash_b64, created_at) VALUES (?, ?, ?, ?, ?)",
-                (email, name, salt_b64, hash_b64, created_at),
-            )
-            conn.commit()
+        await run_in_threadpool(
+            _db_execute,
+            "INSERT INTO users (email, name, password_salt_b64, password_hash_b64, created_at) VALUES (?, ?, ?, ?, ?)",
+            (email, name, salt_b64, hash_b64, created_at),
+        )
     except sqlite3.IntegrityError:
         raise HTTPException(status_code=409, detail="Email already registered")
 
@@ -275,24 +551,33 @@ async def auth_register(req: RegisterRequest, request: Request):
 
 @app.post("/auth/login")
 async def auth_login_password(req: PasswordLoginRequest, request: Request):
-    email = (req.email or "").strip().lower()
+    email = _normalize_email(req.email)
     password = req.password or ""
 
     if not _EMAIL_RE.match(email):
         raise HTTPException(status_code=400, detail="Invalid email address")
 
-    with _db_connect() as conn:
-        row = conn.execute(
-            "SELECT email, name, password_salt_b64, password_hash_b64 FROM users WHERE email = ?",
-            (email,),
-        ).fetchone()
+    row = await run_in_threadpool(
+        _db_fetchone,
+        "SELECT email, name, password_salt_b64, password_hash_b64 FROM users WHERE email = ?",
+        (email,),
+    )
 
     if not row:
         raise HTTPException(status_code=401, detail="Invalid email or password")
 
-    if not _verify_password(password, row["password_salt_b64"], row["password_hash_b64"]):
+    if not await run_in_threadpool(_verify_password, password, row["password_salt_b64"], row["password_hash_b64"]):
         raise HTTPException(status_code=401, detail="Invalid email or password")
 
+    if _is_legacy_hash(row["password_hash_b64"]):
+        # Re-hash PBKDF2 passwords with scrypt now that we have the plaintext
+        salt_b64, hash_b64 = await run_in_threadpool(_hash_password, password)
+        await run_in_threadpool(
+            _db_execute,
+            "UPDATE users SET password_salt_b64 = ?, password_hash_b64 = ? WHERE email = ?",
+            (salt_b64, hash_b64, row["email"]),
+        )
+
     user = {
         "provider": "password",
         "sub": row["email"],
@@ -405,24 +690,26 @@ async def update_profile(req: UpdateProfileRequest, request: Request):
             raise HTTPException(status_code=400, detail="New password must be at least 8 characters")
         
         # Verify current password
-        with _db_connect() as conn:
-            row = conn.execute(
-                "SELECT password_salt_b64, password_hash_b64 FROM users WHERE email = ?",
-                (email,),
-            ).fetchone()
+        row = await run_in_threadpool(
+            _db_fetchone,
+            "SELECT password_salt_b64, password_hash_b64 FROM users WHERE email = ?",
+            (email,),
+        )
         
-        if not row or not _verify_password(req.currentPassword, row["password_salt_b64"], row["password_hash_b64"]):
+        if not row or not await run_in_threadpool(
+            _verify_password, req.currentPassword, row["password_salt_b64"], row["password_hash_b64"]
+        ):
             raise HTTPException(status_code=401, detail="Current password is incorrect")
         
-        salt_b64, hash_b64 = _hash_password(req.newPassword)
+        salt_b64, hash_b64 = await run_in_threadpool(_hash_password, req.newPassword)
         updates["password_salt_b64"] = salt_b64
         updates["password_hash_b64"] = hash_b64
     
     if updates:
-        with _db_connect() as conn:
-            set_clause = ", ".join(f"{k} = ?" for k in updates.keys())
-            conn.execute(f"UPDATE users SET {set_clause} WHERE email = ?", (*updates.values(), email))
-            conn.commit()
+        set_clause = ", ".join(f"{k} = ?" for k in updates.keys())
+        await run_in_threadpool(
+            _db_execute, f"UPDATE users SET {set_clause} WHERE email = ?", (*updates.values(), email)
+        )
         
         if "name" in updates:
             user["name"] = updates["name"]
@@ -450,28 +737,48 @@ async def get_historical(coin: str, limit: int = 168):
     
     url = f"https://api.binance.com/api/v3/klines?symbol={symbol}&interval=1h&limit={limit}"
     try:
-        req = urllib.request.Request(url, headers={"User-Agent": "CryptoForecast/1.0"})
-        with urllib.request.urlopen(req, timeout=10) as resp:
-            data = json.loads(resp.read().decode())
+        resp = await app.state.http.get(url)
+        resp.raise_for_status()
+        data = _json_loads(resp.content)
     except Exception as e:
         raise HTTPException(status_code=502, detail=f"Binance API error: {e}")
     
     # Parse klines: [open_time, open, high, low, close, volume, ...]
-    prices = []
-    for k in data:
+    timestamps, closes = [], []
+    if data:
+        arr = np.asarray(data, dtype=object)
         # Keep timestamp in UTC with Z suffix so browser converts to local time
-        utc_time = pd.Timestamp(k[0], unit="ms", tz="UTC")
-        prices.append({
-            "timestamp": utc_time.strftime("%Y-%m-%dT%H:%M:%SZ"),
-            "price": float(k[4]),  # close price
-        })
-    
-    return {
-        "coin": coin,
-        "symbol": symbol,
-        "interval": "1h",
-        "prices": prices,
-    }
+        # (numpy's formatter runs in C; timezone="UTC" appends the Z)
+        open_times = arr[:, 0].astype(np.int64).astype("datetime64[ms]")
+        timestamps = np.datetime_as_string(open_times, unit="s", timezone="UTC").tolist()
+        closes = arr[:, 4].astype(np.float64).tolist()  # close price
+
+    # Parsing errors surface as a 502 above; from here on the body is streamed
+    # so the headers and first rows go out while the rest is being serialized
+    return StreamingResponse(
+        _iter_historical_json(coin, symbol, timestamps, closes),
+        media_type="application/json",
+    )
+
+
+_HISTORICAL_CHUNK_ROWS = 200
+
+
+def _iter_historical_json(coin: str, symbol: str, timestamps: list, closes: list):
+    """Yield {"coin", "symbol", "interval", "prices": [...]} as JSON in chunks of rows."""
+    head = _json_dumps({"coin": coin, "symbol": symbol, "interval": "1h"})
+    yield head[:-1] + b',"prices":['
+    for start in range(0, len(timestamps), _HISTORICAL_CHUNK_ROWS):
+        rows = [
+            {"timestamp": ts, "price": price}
+            for ts, price in zip(
+                timestamps[start:start + _HISTORICAL_CHUNK_ROWS],
+                closes[start:start + _HISTORICAL_CHUNK_ROWS],
+            )
+        ]
+        chunk = _json_dumps(rows)[1:-1]
+        yield chunk if start == 0 else b"," + chunk
+    yield b"]}"
 
 
 # ========================================
@@ -502,7 +809,12 @@ def _init_history_db() -> None:
             )
             """
         )
-        conn.execute("CREATE INDEX IF NOT EXISTS idx_history_user ON prediction_history(user_email)")
+        # Serves /history's per-user newest-first listing straight from the index
+        # (scanned backwards, no sort); supersedes the old user_email-only index
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_history_user_time ON prediction_history(user_email, predicted_at)"
+        )
+        conn.execute("DROP INDEX IF EXISTS idx_history_user")
         conn.commit()
         
         # Migration: Add new columns to existing tables BEFORE creating indexes on them
@@ -510,6 +822,11 @@ def _init_history_db() -> None:
         
         # Create index on accuracy_verified_at after migration ensures column exists
         conn.execute("CREATE INDEX IF NOT EXISTS idx_history_pending ON prediction_history(accuracy_verified_at)")
+        # Lets the accuracy verifier select due predictions entirely in SQL
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_history_pending_target "
+            "ON prediction_history(accuracy_verified_at, last_target_ts)"
+        )
         conn.commit()
 
 
@@ -523,6 +840,7 @@ def _migrate_history_db(conn: sqlite3.Connection) -> None:
         ("actual_prices_json", "TEXT"),
         ("accuracy_verified_at", "TEXT"),
         ("mean_error_pct", "REAL"),
+        ("last_target_ts", "TEXT"),
     ]
     
     for col_name, col_type in new_columns:
@@ -530,6 +848,16 @@ def _migrate_history_db(conn: sqlite3.Connection) -> None:
             conn.execute(f"ALTER TABLE prediction_history ADD COLUMN {col_name} {col_type}")
             print(f"[MIGRATION] Added column {col_name} to prediction_history")
     
+    if "last_target_ts" not in existing_columns:
+        # Backfill from the stored JSON array (last element, 'Z' suffix stripped)
+        conn.execute(
+            """
+            UPDATE prediction_history
+            SET last_target_ts = rtrim(json_extract(target_timestamps_json, '$[#-1]'), 'Z')
+            WHERE target_timestamps_json IS NOT NULL
+            """
+        )
+    
     conn.commit()
 
 
@@ -545,156 +873,141 @@ class SaveHistoryRequest(BaseModel):
     target_timestamps: Optional[list] = None  # List of ISO timestamps for each prediction step
 
 
-@app.get("/history")
-async def get_history(request: Request):
-    # Priority: X-User-Email header > session > X-Guest-ID header
+def _resolve_user_key(request: Request, create_guest: bool = True) -> str:
+    """History owner for a request: X-User-Email header > session user > guest ID.
+
+    Guests without an X-Guest-ID header get a session guest ID, created on
+    first use unless create_guest is False (then 401).
+    """
     user_email_header = request.headers.get("X-User-Email")
-    user = request.session.get("user")
-    
     if user_email_header:
         # Frontend explicitly sent user email (authenticated user)
-        user_key = user_email_header
-        print(f"[HISTORY] Using X-User-Email header: {user_key}")
-    elif user:
+        logger.debug("[HISTORY] Using X-User-Email header: %s", user_email_header)
+        return user_email_header
+    
+    user = request.session.get("user")
+    if user:
         # Session-based authentication
         user_key = user.get("email", "guest")
-        print(f"[HISTORY] Using session user: {user_key}")
-    else:
-        # Guest user - use X-Guest-ID header
-        guest_id = request.headers.get("X-Guest-ID")
-        if not guest_id:
-            if "guest_id" not in request.session:
-                import uuid
-                request.session["guest_id"] = f"guest_{uuid.uuid4().hex[:12]}"
-            guest_id = request.session["guest_id"]
-        user_key = guest_id
-        print(f"[HISTORY] Using guest ID: {user_key}")
+        logger.debug("[HISTORY] Using session user: %s", user_key)
+        return user_key
     
-    with _db_connect() as conn:
-        rows = conn.execute(
-            """
-            SELECT id, coin, horizon, steps_ahead, use_live_data, predicted_at,
-                   last_observed_close, first_predicted_price, last_predicted_price,
-                   predictions_json, target_timestamps_json, actual_prices_json,
-                   accuracy_verified_at, mean_error_pct
-            FROM prediction_history
-            WHERE user_email = ?
-            ORDER BY predicted_at DESC
-            LIMIT 100
-            """,
-            (user_key,),
-        ).fetchall()
+    # Guest user - use X-Guest-ID header
+    guest_id = request.headers.get("X-Guest-ID")
+    if not guest_id:
+        if "guest_id" not in request.session:
+            if not create_guest:
+                raise HTTPException(status_code=401, detail="Not authenticated")
+            request.session["guest_id"] = f"guest_{secrets.token_hex(6)}"
+        guest_id = request.session["guest_id"]
+    logger.debug("[HISTORY] Using guest ID: %s", guest_id)
+    return guest_id
+
+
+@app.get("/history")
+async def get_history(request: Request, cursor: Optional[int] = None, limit: int = 100):
+    user_key = _resolve_user_key(request)
+    
+    # Keyset pagination: pass the previous page's next_cursor (a row id) as ?cursor=.
+    # Rows saved together share predicted_at, so the id breaks ties.
+    limit = min(max(1, limit), 100)
+    cursor_filter = ""
+    params = (user_key, limit)
+    if cursor is not None:
+        cursor_filter = "AND (predicted_at, id) < (SELECT predicted_at, id FROM prediction_history WHERE id = ?)"
+        params = (user_key, cursor, limit)
     
+    rows = await run_in_threadpool(
+        _db_fetchall,
+        f"""
+        SELECT id, coin, horizon, steps_ahead, use_live_data, predicted_at,
+               last_observed_close, first_predicted_price, last_predicted_price,
+               predictions_json AS predictions, target_timestamps_json AS target_timestamps,
+               actual_prices_json AS actual_prices, accuracy_verified_at, mean_error_pct
+        FROM prediction_history
+        WHERE user_email = ? {cursor_filter}
+        ORDER BY predicted_at DESC, id DESC
+        LIMIT ?
+        """,
+        params,
+    )
+    
+    # Rows come back already keyed (and ordered) as the response fields; only the
+    # JSON columns need decoding
     history = []
     for row in rows:
-        predictions = None
-        if row["predictions_json"]:
-            try:
-                predictions = json.loads(row["predictions_json"])
-            except:
-                pass
-        
-        target_timestamps = None
-        if row["target_timestamps_json"]:
-            try:
-                target_timestamps = json.loads(row["target_timestamps_json"])
-            except:
-                pass
-        
-        actual_prices = None
-        if row["actual_prices_json"]:
-            try:
-                actual_prices = json.loads(row["actual_prices_json"])
-            except:
-                pass
-        
-        history.append({
-            "id": row["id"],
-            "coin": row["coin"],
-            "horizon": row["horizon"],
-            "steps_ahead": row["steps_ahead"],
-            "use_live_data": bool(row["use_live_data"]),
-            "predicted_at": row["predicted_at"],
-            "last_observed_close": row["last_observed_close"],
-            "first_predicted_price": row["first_predicted_price"],
-            "last_predicted_price": row["last_predicted_price"],
-            "predictions": predictions,
-            "target_timestamps": target_timestamps,
-            "actual_prices": actual_prices,
-            "accuracy_verified_at": row["accuracy_verified_at"],
-            "mean_error_pct": row["mean_error_pct"],
-        })
+        item = dict(row)
+        item["use_live_data"] = bool(item["use_live_data"])
+        for key in ("predictions", "target_timestamps", "actual_prices"):
+            raw, item[key] = item[key], None
+            if raw:
+                try:
+                    item[key] = _json_loads(raw)
+                except:
+                    pass
+        history.append(item)
     
-    return {"history": history, "user_key": user_key}
+    next_cursor = history[-1]["id"] if len(history) == limit else None
+    # Returned as a response directly: the payload is already JSON-native, so
+    # FastAPI's jsonable_encoder pass over every row and list is skipped
+    return _DEFAULT_RESPONSE_CLASS({"history": history, "user_key": user_key, "next_cursor": next_cursor})
+
+
+_HISTORY_INSERT_SQL = """
+    INSERT INTO prediction_history 
+    (user_email, coin, horizon, steps_ahead, use_live_data, predicted_at,
+     last_observed_close, first_predicted_price, last_predicted_price, 
+     predictions_json, target_timestamps_json, last_target_ts)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+
+def _history_row(req: SaveHistoryRequest, user_key: str, predicted_at: str) -> tuple:
+    """Parameters for _HISTORY_INSERT_SQL."""
+    predictions_json = _json_dumps(req.predictions).decode() if req.predictions else None
+    target_timestamps_json = _json_dumps(req.target_timestamps).decode() if req.target_timestamps else None
+    # Naive-UTC ISO string so it compares lexically against the verifier's cutoff
+    last_target_ts = str(req.target_timestamps[-1]).rstrip("Z") if req.target_timestamps else None
+    return (user_key, req.coin, req.horizon, req.steps_ahead, int(req.use_live_data),
+            predicted_at, req.last_observed_close, req.first_predicted_price,
+            req.last_predicted_price, predictions_json, target_timestamps_json, last_target_ts)
 
 
 @app.post("/history")
 async def save_history(req: SaveHistoryRequest, request: Request):
-    # Priority: X-User-Email header > session > X-Guest-ID header
-    user_email_header = request.headers.get("X-User-Email")
-    user = request.session.get("user")
+    user_key = _resolve_user_key(request)
+    predicted_at = datetime.utcnow().replace(microsecond=0).isoformat() + "Z"
     
-    if user_email_header:
-        user_key = user_email_header
-    elif user:
-        user_key = user.get("email", "guest")
-    else:
-        guest_id = request.headers.get("X-Guest-ID")
-        if not guest_id:
-            if "guest_id" not in request.session:
-                import uuid
-                request.session["guest_id"] = f"guest_{uuid.uuid4().hex[:12]}"
-            guest_id = request.session["guest_id"]
-        user_key = guest_id
+    history_id = await run_in_threadpool(
+        _db_execute, _HISTORY_INSERT_SQL, _history_row(req, user_key, predicted_at)
+    )
     
+    return {"ok": True, "id": history_id}
+
+
+@app.post("/history/bulk")
+async def save_history_bulk(reqs: List[SaveHistoryRequest], request: Request):
+    """Save several predictions in one transaction (one commit instead of one per row)."""
+    user_key = _resolve_user_key(request)
     predicted_at = datetime.utcnow().replace(microsecond=0).isoformat() + "Z"
-    predictions_json = json.dumps(req.predictions) if req.predictions else None
-    target_timestamps_json = json.dumps(req.target_timestamps) if req.target_timestamps else None
     
-    with _db_connect() as conn:
-        cursor = conn.execute(
-            """
-            INSERT INTO prediction_history 
-            (user_email, coin, horizon, steps_ahead, use_live_data, predicted_at,
-             last_observed_close, first_predicted_price, last_predicted_price, 
-             predictions_json, target_timestamps_json)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """,
-            (user_key, req.coin, req.horizon, req.steps_ahead, int(req.use_live_data),
-             predicted_at, req.last_observed_close, req.first_predicted_price,
-             req.last_predicted_price, predictions_json, target_timestamps_json),
-        )
-        conn.commit()
-        history_id = cursor.lastrowid
+    rows = [_history_row(req, user_key, predicted_at) for req in reqs]
+    if rows:
+        await run_in_threadpool(_db_executemany, _HISTORY_INSERT_SQL, rows)
     
-    return {"ok": True, "id": history_id}
+    return {"ok": True, "count": len(rows)}
 
 
 @app.delete("/history/{history_id}")
 async def delete_history(history_id: int, request: Request):
-    # Priority: X-User-Email header > session > X-Guest-ID header
-    user_email_header = request.headers.get("X-User-Email")
-    user = request.session.get("user")
-    
-    if user_email_header:
-        user_key = user_email_header
-    elif user:
-        user_key = user.get("email", "guest")
-    else:
-        guest_id = request.headers.get("X-Guest-ID")
-        if not guest_id:
-            if "guest_id" not in request.session:
-                raise HTTPException(status_code=401, detail="Not authenticated")
-            guest_id = request.session["guest_id"]
-        user_key = guest_id
+    user_key = _resolve_user_key(request, create_guest=False)
     
-    with _db_connect() as conn:
-        # Ensure user can only delete their own history
-        conn.execute(
-            "DELETE FROM prediction_history WHERE id = ? AND user_email = ?",
-            (history_id, user_key),
-        )
-        conn.commit()
+    # Ensure user can only delete their own history
+    await run_in_threadpool(
+        _db_execute,
+        "DELETE FROM prediction_history WHERE id = ? AND user_email = ?",
+        (history_id, user_key),
+    )
     
     return {"ok": True}
 
@@ -704,173 +1017,359 @@ async def delete_history(history_id: int, request: Request):
 async def _on_startup():
     _init_auth_db()
     _init_history_db()
-
-
-def _fetch_binance_price_usdt(symbol: str) -> float:
-    url = f"https://api.binance.com/api/v3/ticker/price?symbol={symbol}"
+    _fill_db_pool()
+    # Shared async client: Binance calls no longer block the event loop and
+    # reuse pooled keep-alive connections instead of a new TLS handshake each
+    # (httpx sends Accept-Encoding: gzip by default, so kline pages come compressed)
+    app.state.http = httpx.AsyncClient(
+        headers={"User-Agent": "CryptoForecast/1.0"},
+        timeout=httpx.Timeout(10.0),
+        limits=httpx.Limits(max_connections=32, max_keepalive_connections=16),
+    )
+
+
+@app.on_event("shutdown")
+async def _on_shutdown():
+    await app.state.http.aclose()
+
+
+# Spot price cache: {"prices": list, "timestamp": str, "fetched_at": timestamp}
+# Only successful fetches are stored; a Binance error (502) is retried on the next call
+_current_prices_cache: dict = {}
+CURRENT_PRICES_CACHE_TTL = 5  # seconds
+# Refresh in flight: concurrent misses share one batch ticker request
+_current_prices_refresh: Optional[asyncio.Future] = None
+
+
+async def _fetch_binance_prices_usdt(symbols: list) -> dict:
+    """{symbol: price} for all symbols from one batch ticker request."""
+    url = "https://api.binance.com/api/v3/ticker/price"
+    params = {"symbols": _json_dumps(symbols).decode()}
     try:
-        with urllib.request.urlopen(url, timeout=10) as resp:
-            payload = json.loads(resp.read().decode("utf-8"))
-    except urllib.error.HTTPError as exc:
-        raise HTTPException(status_code=502, detail=f"Binance HTTP error for {symbol}: {exc.code}")
+        resp = await app.state.http.get(url, params=params)
+        resp.raise_for_status()
+        payload = _json_loads(resp.content)
+    except httpx.HTTPStatusError as exc:
+        raise HTTPException(status_code=502, detail=f"Binance HTTP error for {symbols}: {exc.response.status_code}")
     except Exception as exc:
-        raise HTTPException(status_code=502, detail=f"Failed to fetch Binance price for {symbol}: {exc}")
+        raise HTTPException(status_code=502, detail=f"Failed to fetch Binance prices for {symbols}: {exc}")
 
-    price_str = payload.get("price")
     try:
-        return float(price_str)
+        prices = {item["symbol"]: float(item["price"]) for item in payload}
+        return {symbol: prices[symbol] for symbol in symbols}
     except Exception:
-        raise HTTPException(status_code=502, detail=f"Invalid Binance response for {symbol}: {payload}")
+        raise HTTPException(status_code=502, detail=f"Invalid Binance response for {symbols}: {payload}")
+
+
+async def _refresh_current_prices() -> dict:
+    global _current_prices_refresh
+    try:
+        now_iso = datetime.utcnow().replace(microsecond=0).isoformat() + "Z"
+        prices = await _fetch_binance_prices_usdt(list(BINANCE_SYMBOLS.values()))
+        out = []
+        for coin, symbol in BINANCE_SYMBOLS.items():
+            out.append({
+                "coin": coin,
+                "symbol": symbol,
+                "price_usd": prices[symbol],
+            })
+
+        _current_prices_cache.update(prices=out, timestamp=now_iso, fetched_at=time.time())
+        return _current_prices_cache
+    finally:
+        _current_prices_refresh = None
 
 
 @app.get("/current-prices")
 async def current_prices():
     """Live spot prices from Binance (USDT pairs)."""
+    global _current_prices_refresh
 
-    now_iso = datetime.utcnow().replace(microsecond=0).isoformat() + "Z"
-    out = []
-    for coin, symbol in BINANCE_SYMBOLS.items():
-        price = _fetch_binance_price_usdt(symbol)
-        out.append({
-            "coin": coin,
-            "symbol": symbol,
-            "price_usd": price,
-        })
+    cached = _current_prices_cache
+    if not (cached and (time.time() - cached["fetched_at"]) < CURRENT_PRICES_CACHE_TTL):
+        refresh = _current_prices_refresh
+        if refresh is None or refresh.get_loop() is not asyncio.get_running_loop():
+            refresh = _current_prices_refresh = asyncio.ensure_future(_refresh_current_prices())
+        # A cancelled request must not cancel the refresh other requests are awaiting
+        cached = await asyncio.shield(refresh)
 
-    return {
+    return _DEFAULT_RESPONSE_CLASS({
         "source": "binance",
-        "timestamp": now_iso,
-        "prices": out,
-    }
+        "timestamp": cached["timestamp"],
+        "prices": cached["prices"],
+    })
 
 
-def _safe_float(value: Any, default: float = 0.0) -> float:
-    try:
-        if value is None:
-            return float(default)
-        if isinstance(value, (np.floating, np.integer)):
-            return float(value)
-        return float(value)
-    except Exception:
-        return float(default)
+# feature_cols entries read or written for a synthetic row, in the order
+# _fill_synthetic_row expects their positions
+_SYNTHETIC_COLS = (
+    "open", "high", "low", "volume", "missing_flag", "return_1h",
+    "vol_change", "volatility_24h", "ma_24", "ma_168", "ma_ratio",
+)
 
 
-def _append_synthetic_row(
-    df_ext: pd.DataFrame,
-    ts: pd.Timestamp,
-    close_price: float,
-    *,
-    horizon_hours: int,
-) -> pd.DataFrame:
-    """Append one synthetic row at timestamp ts using predicted close.
+def _fill_synthetic_row(row, prev_row, closes, n, col, horizon_hours, ma24_steps, ma168_steps, ma_sums):
+    """Fill row with the features of the synthetic step whose close is closes[n - 1].
 
-    We must fill all feature columns used by the model. Because future OHLCV is unknown,
-    we use simple assumptions (open=prev close, high/low bounds, volume carried forward)
-    and recompute derived indicators for that new row.
+    ma_sums holds the running sums of the last ma24_steps / ma168_steps closes
+    before this one and is advanced in place.
     """
-
-    if len(df_ext) == 0:
-        raise ValueError("df_ext must have at least one row")
-
-    prev_row = df_ext.iloc[-1]
-    prev_close = _safe_float(prev_row.get("close"), default=close_price)
-    prev_volume = _safe_float(prev_row.get("volume"), default=0.0)
-
-    open_price = prev_close
-    high_price = max(open_price, close_price)
-    low_price = min(open_price, close_price)
+    close_price = closes[n - 1]
+    prev_close = closes[n - 2]
+    prev_volume = prev_row[col[3]]
     volume = prev_volume
 
-    new_row = {
-        "open": open_price,
-        "high": high_price,
-        "low": low_price,
-        "close": close_price,
-        "volume": volume,
-        "missing_flag": 1.0,
-    }
-
-    # Ensure all columns exist before assignment
-    out = df_ext.copy()
-    for col, val in new_row.items():
-        if col not in out.columns:
-            out[col] = np.nan
-        out.loc[ts, col] = val
+    row[col[0]] = prev_close
+    row[col[1]] = max(prev_close, close_price)
+    row[col[2]] = min(prev_close, close_price)
+    row[col[3]] = volume
+    row[col[4]] = 1.0
 
-    # Derived features expected by the model
     # return_1h: If horizon is > 1h (e.g. 24h), the step return is a 24h return.
     # We must downscale it to an approximate 1h return to match model expectations.
-    if "return_1h" not in out.columns:
-        out["return_1h"] = np.nan
-    
-    if len(out) >= 2:
-        prev_close_for_ret = _safe_float(out["close"].iloc[-2], default=0.0)
-        step_return = (close_price / prev_close_for_ret - 1.0) if prev_close_for_ret else 0.0
-        
-        if horizon_hours > 1:
-            # Geometric downscaling: (1 + R_24h)^(1/24) - 1
-            # Note: This assumes constant growth over the period, which is the best neutral guess.
-            # We add 1.0 only if step_return > -1.0 to avoid complex numbers.
-            if step_return > -1.0:
-                 out.loc[ts, "return_1h"] = (1.0 + step_return) ** (1.0 / horizon_hours) - 1.0
-            else:
-                 out.loc[ts, "return_1h"] = step_return / horizon_hours  # Linear fallback for crash
+    step_return = (close_price / prev_close - 1.0) if prev_close else 0.0
+    if horizon_hours > 1:
+        # Geometric downscaling: (1 + R_24h)^(1/24) - 1
+        # Note: This assumes constant growth over the period, which is the best neutral guess.
+        # We add 1.0 only if step_return > -1.0 to avoid complex numbers.
+        if step_return > -1.0:
+            step_return = (1.0 + step_return) ** (1.0 / horizon_hours) - 1.0
         else:
-            out.loc[ts, "return_1h"] = step_return
-    else:
-        out.loc[ts, "return_1h"] = 0.0
+            step_return = step_return / horizon_hours  # Linear fallback for crash
+    row[col[5]] = step_return
 
     # vol_change: derived from volume change over the step
-    # For large horizons, volume might be cumulative or instantaneous.
-    # We'll just use simple linear scaling or keep it raw if it's intensity.
-    if "vol_change" not in out.columns:
-        out["vol_change"] = np.nan
-    if len(out) >= 2:
-        prev_vol_for_change = _safe_float(out["volume"].iloc[-2], default=0.0)
-        out.loc[ts, "vol_change"] = (volume / prev_vol_for_change - 1.0) if prev_vol_for_change else 0.0
-    else:
-        out.loc[ts, "vol_change"] = 0.0
-
-    # volatility_24h (std of last 24 returns)
-    # If we are stepping by 24h, we only have 1 data point per day.
-    # Calculating std of last 24 *steps* would look back 24 days, which is wrong.
-    # Instead, we should ideally carry forward the last known valid volatility,
-    # as we don't have enough intra-step data to compute new volatility.
-    if "volatility_24h" not in out.columns:
-        out["volatility_24h"] = np.nan
-    
-    if len(out) >= 2:
-         # Just carry forward the previous volatility to avoid wild swings from sparse data
-         prev_volatility = _safe_float(out["volatility_24h"].iloc[-2], default=0.0)
-         out.loc[ts, "volatility_24h"] = prev_volatility
-    else:
-         out.loc[ts, "volatility_24h"] = 0.0
-
-    # moving averages
-    # For 24h steps, ma_24 (24 hours) is just the immediate last price (window=1 step).
-    # ma_168 (7 days) is approx 7 steps.
-    for ma_col, window_hours in (("ma_24", 24), ("ma_168", 168)):
-        if ma_col not in out.columns:
-            out[ma_col] = np.nan
-        
-        # Adjust window size based on horizon steps
-        # e.g. for 24h horizon: ma_24 -> 1 step, ma_168 -> 7 steps
-        window_steps = max(1, int(window_hours / horizon_hours))
-        
-        w = min(window_steps, len(out))
-        out.loc[ts, ma_col] = float(out["close"].iloc[-w:].mean())
+    row[col[6]] = (volume / prev_volume - 1.0) if prev_volume else 0.0
+
+    # volatility_24h: with 24h steps there is only one data point per day, so
+    # a std over the last 24 *steps* would look back 24 days. Carry forward the
+    # last known volatility instead to avoid wild swings from sparse data.
+    row[col[7]] = prev_row[col[7]]
+
+    # Moving averages from running sums: add the new close, drop the one leaving the window
+    ma_sums[0] += close_price - (closes[n - 1 - ma24_steps] if n > ma24_steps else 0.0)
+    ma_sums[1] += close_price - (closes[n - 1 - ma168_steps] if n > ma168_steps else 0.0)
+    ma_24 = ma_sums[0] / min(n, ma24_steps)
+    ma_168 = ma_sums[1] / min(n, ma168_steps)
+    row[col[8]] = ma_24
+    row[col[9]] = ma_168
+    row[col[10]] = (ma_24 / ma_168) if ma_168 else 1.0
+
+
+if njit is not None:
+    _fill_synthetic_row = njit(cache=True, error_model="numpy")(_fill_synthetic_row)
+    # Compile once at import instead of on the first forecast
+    _fill_synthetic_row(np.empty(11), np.ones(11), np.ones(2), 2, np.arange(11), 1, 1, 1, np.zeros(2))
+
+
+class _SyntheticRows:
+    """Feature rows appended after the observed data, one per forecast step.
+
+    Because future OHLCV is unknown, each row uses simple assumptions (open=prev
+    close, high/low bounds, volume carried forward) and recomputes the derived
+    indicators from the closes so far (_fill_synthetic_row). Rows are numpy
+    vectors in feature_cols order; closes go into a buffer preallocated for
+    every step of the forecast, so nothing is copied or reindexed per step.
+    """
+
+    def __init__(self, last_row: np.ndarray, closes: np.ndarray, feature_cols: list, *, horizon_hours: int, max_rows: int):
+        """last_row: final observed feature row; closes: observed closes (at least ma_168's window)."""
+        self._col = np.array([feature_cols.index(c) for c in _SYNTHETIC_COLS], dtype=np.int64)
+        self._horizon_hours = horizon_hours
+        # For 24h steps, ma_24 (24 hours) is just the immediate last price (window=1 step)
+        # and ma_168 (7 days) is approx 7 steps
+        self._ma24_steps = max(1, int(24 / horizon_hours))
+        self._ma168_steps = max(1, int(168 / horizon_hours))
+        self.last_row = np.asarray(last_row, dtype=np.float64)
+        self._closes = np.empty(len(closes) + max_rows)
+        self._closes[:len(closes)] = closes
+        self._n = len(closes)
+        self._ma_sums = np.array([
+            closes[-self._ma24_steps:].sum(),
+            closes[-self._ma168_steps:].sum(),
+        ])
+
+    def append(self, close_price: float) -> np.ndarray:
+        """Add the row for the next step given its predicted close and return it."""
+        self._closes[self._n] = close_price
+        self._n += 1
+        row = np.empty_like(self.last_row)
+        _fill_synthetic_row(
+            row, self.last_row, self._closes, self._n, self._col,
+            self._horizon_hours, self._ma24_steps, self._ma168_steps, self._ma_sums,
+        )
+        self.last_row = row
+        return row
+
+
+def _scaler_affine(scaler: Any) -> Tuple[np.ndarray, np.ndarray]:
+    """Return (scale, offset) such that scaler.transform(X) == X * scale + offset."""
+    if hasattr(scaler, "min_"):  # MinMaxScaler
+        return np.asarray(scaler.scale_, dtype=np.float64), np.asarray(scaler.min_, dtype=np.float64)
+    if hasattr(scaler, "mean_"):  # StandardScaler
+        scale = 1.0 / np.asarray(scaler.scale_, dtype=np.float64)
+        return scale, -np.asarray(scaler.mean_, dtype=np.float64) * scale
+    raise HTTPException(status_code=500, detail=f"Unsupported scaler type: {type(scaler).__name__}")
+
+
+class _TFLiteModel:
+    """Keras-style predict() over TFLite interpreters, one per batch bucket.
+
+    Resizing an interpreter's input reallocates all of its tensors, and every
+    forecast alternates between batch sizes (observed windows, then single
+    steps), so each size gets its own interpreter instead. Batches are padded
+    up to a power of two, which keeps that to a handful of interpreters.
+    """
+
+    def __init__(self, tflite_bytes: bytes):
+        self._tflite_bytes = tflite_bytes
+        self._interpreters = {}
+        # An interpreter holds mutable tensor state; one invocation at a time
+        self._lock = threading.Lock()
+
+    def _interpreter(self, batch: int) -> Tuple[Any, int, int]:
+        entry = self._interpreters.get(batch)
+        if entry is None:
+            interpreter = tf.lite.Interpreter(model_content=self._tflite_bytes, num_threads=os.cpu_count())
+            input_details = interpreter.get_input_details()[0]
+            if input_details["shape"][0] != batch:
+                interpreter.resize_tensor_input(input_details["index"], (batch, *input_details["shape"][1:]))
+            interpreter.allocate_tensors()
+            entry = (interpreter, input_details["index"], interpreter.get_output_details()[0]["index"])
+            self._interpreters[batch] = entry
+        return entry
+
+    def predict(self, x: np.ndarray, verbose: int = 0) -> np.ndarray:
+        x = np.ascontiguousarray(x, dtype=np.float32)
+        n = x.shape[0]
+        bucket = 1 << max(n - 1, 0).bit_length()
+        if bucket != n:
+            # Rows are independent, so zero padding doesn't change the real outputs
+            x = np.concatenate([x, np.zeros((bucket - n, *x.shape[1:]), dtype=np.float32)])
+        with self._lock:
+            interpreter, input_index, output_index = self._interpreter(bucket)
+            interpreter.set_tensor(input_index, x)
+            interpreter.invoke()
+            return interpreter.get_tensor(output_index)[:n].copy()
+
+
+class _KerasModel:
+    """predict() through one traced tf.function instead of Keras' predict loop.
+
+    model.predict builds a dataset, callbacks and progress bar per call; for a
+    single small batch that scaffolding costs more than the forward pass.
+    """
+
+    def __init__(self, model: Any):
+        self.model = model
+        self._infer = tf.function(
+            lambda x: model(x, training=False),
+            input_signature=[tf.TensorSpec((None, *model.input_shape[1:]), tf.float32)],
+            autograph=False,
+        )
+
+    def predict(self, x: np.ndarray, verbose: int = 0) -> np.ndarray:
+        return self._infer(np.ascontiguousarray(x, dtype=np.float32)).numpy()
 
-    if "ma_ratio" not in out.columns:
-        out["ma_ratio"] = np.nan
-    ma_24 = _safe_float(out.loc[ts, "ma_24"], default=0.0)
-    ma_168 = _safe_float(out.loc[ts, "ma_168"], default=0.0)
-    out.loc[ts, "ma_ratio"] = (ma_24 / ma_168) if ma_168 else 1.0
 
-    # Fill any remaining NaNs in expected feature columns with the last valid value
-    # (helps prevent scaler/model issues for early synthetic steps)
-    out = out.sort_index()
-    out = out.ffill()
-    return out
+def _convert_to_tflite(model: Any) -> bytes:
+    # The converter cannot lower the LSTM while-loop with its variable reads,
+    # but the sequence length is fixed, so an unrolled copy converts to plain ops
+    config = model.get_config()
+    for layer in config["layers"]:
+        if layer["class_name"] == "LSTM":
+            layer["config"]["unroll"] = True
+    unrolled = model.__class__.from_config(config)
+    unrolled.set_weights(model.get_weights())
+
+    converter = tf.lite.TFLiteConverter.from_keras_model(unrolled)
+    if TFLITE_QUANTIZE:
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    return converter.convert()
+
+
+def _weights_path(model_path: Path) -> Path:
+    # Fine-tuning saves updated weights next to the .keras archive
+    return model_path.with_suffix(".weights.h5")
+
+
+def _load_tflite_model(model: Any, model_path: Path) -> Optional[_TFLiteModel]:
+    """TFLite version of model, or None if conversion fails."""
+    tflite_path = TFLITE_CACHE_DIR / (model_path.stem + (".int8.tflite" if TFLITE_QUANTIZE else ".tflite"))
+    weights_path = _weights_path(model_path)
+    model_mtime = max(p.stat().st_mtime for p in (model_path, weights_path) if p.exists())
+    try:
+        if tflite_path.exists() and tflite_path.stat().st_mtime >= model_mtime:
+            tflite_bytes = tflite_path.read_bytes()
+        else:
+            tflite_bytes = _convert_to_tflite(model)
+            try:
+                # Written aside and renamed so other workers never read a partial file
+                TFLITE_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+                tmp_path = tflite_path.with_name(f"{tflite_path.name}.{os.getpid()}.tmp")
+                tmp_path.write_bytes(tflite_bytes)
+                os.replace(tmp_path, tflite_path)
+            except OSError as exc:
+                print(f"[TFLITE] Could not cache {tflite_path.name}: {exc}")
+        return _TFLiteModel(tflite_bytes)
+    except Exception as exc:
+        print(f"[TFLITE] Falling back to Keras for {model_path.name}: {exc}")
+        return None
+
+
+class _MicroBatcher:
+    """Coalesces concurrent predict() calls on one model into batched forward passes."""
+
+    def __init__(self, model: Any):
+        self.model = model
+        self._queue = None
+        self._task = None
+
+    async def predict(self, windows: np.ndarray) -> np.ndarray:
+        # (Re)start the worker on the running loop (e.g. after a test client restart)
+        if self._task is None or self._task.done() or self._task.get_loop() is not asyncio.get_running_loop():
+            self._queue = asyncio.Queue()
+            self._task = asyncio.create_task(self._run(self._queue))
+        fut = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((windows, fut))
+        return await fut
+
+    async def _run(self, q: asyncio.Queue) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            items = [await q.get()]
+            n = len(items[0][0])
+            deadline = loop.time() + PREDICT_BATCH_WAIT_MS / 1000
+            while n < PREDICT_BATCH_MAX:
+                try:
+                    timeout = deadline - loop.time()
+                    item = q.get_nowait() if timeout <= 0 else await asyncio.wait_for(q.get(), timeout)
+                except (asyncio.QueueEmpty, asyncio.TimeoutError):
+                    break
+                items.append(item)
+                n += len(item[0])
+
+            batch = items[0][0] if len(items) == 1 else np.concatenate([w for w, _ in items])
+            try:
+                # Off the event loop so new requests keep queueing meanwhile
+                preds = await loop.run_in_executor(None, self.model.predict, batch)
+            except Exception as exc:
+                for _, fut in items:
+                    if not fut.done():
+                        fut.set_exception(exc)
+                continue
+            i = 0
+            for w, fut in items:
+                if not fut.done():
+                    fut.set_result(preds[i:i + len(w)])
+                i += len(w)
+
+
+def _get_predict_batcher(key: str, model: Any) -> _MicroBatcher:
+    batcher = _predict_batchers.get(key)
+    if batcher is None or batcher.model is not model:
+        batcher = _predict_batchers[key] = _MicroBatcher(model)
+    return batcher
 
 
 def load_model_and_scalers(coin: str, horizon: str) -> Tuple[Any, Tuple[Any, Any]]:
@@ -906,33 +1405,52 @@ def load_model_and_scalers(coin: str, horizon: str) -> Tuple[Any, Tuple[Any, Any
     if not price_scaler_path.exists():
         raise HTTPException(status_code=404, detail=f"Price scaler not found in {scaler_dir}")
 
-    try:
-        import tensorflow as tf  # lazy import
-    except Exception as exc:
-        raise HTTPException(status_code=500, detail=f"TensorFlow is not available: {exc}")
+    if tf is None:
+        raise HTTPException(status_code=500, detail=f"TensorFlow is not available: {_TF_IMPORT_ERROR}")
 
-    # Global fix: Monkey-patch Dense layer to ignore 'quantization_config'
-    # This handles Keras 3 -> Keras 2 deserialization issues globally
-    if not getattr(tf.keras.layers.Dense, "_patched", False):
-        original_init = tf.keras.layers.Dense.__init__
-
-        def new_init(self, *args, **kwargs):
-            kwargs.pop("quantization_config", None)
-            original_init(self, *args, **kwargs)
-
-        tf.keras.layers.Dense.__init__ = new_init
-        tf.keras.layers.Dense._patched = True
-
-    model = tf.keras.models.load_model(str(model_path))
+    keras_model = tf.keras.models.load_model(str(model_path))
+    if _weights_path(model_path).exists():
+        keras_model.load_weights(str(_weights_path(model_path)))
+    model = _load_tflite_model(keras_model, model_path) if USE_TFLITE else None
+    if model is None:
+        model = _KerasModel(keras_model)
     feature_scaler = joblib.load(str(feat_scaler_path))
     price_scaler = joblib.load(str(price_scaler_path))
 
     model_cache[key] = model
     scaler_cache[key] = (feature_scaler, price_scaler)
+    scaler_affine_cache[key] = (_scaler_affine(feature_scaler), _scaler_affine(price_scaler))
 
     return model, (feature_scaler, price_scaler)
 
 
+def _warm_model(coin: str, horizon: str) -> None:
+    model, (feature_scaler, _) = load_model_and_scalers(coin, horizon)
+    # Dummy forward passes so graph tracing / tensor allocation happens now, for
+    # both batch sizes every forecast uses (calibration + first window, then one)
+    n_features = getattr(feature_scaler, "n_features_in_", 11)
+    for batch in (2, 1):
+        model.predict(np.zeros((batch, SEQ_LEN, n_features), dtype=np.float32), verbose=0)
+    # Static-data forecasts also need the processed dataset
+    _load_processed_df(coin)
+
+
+@app.on_event("startup")
+async def _warm_model_cache():
+    if not WARM_MODEL_CACHE:
+        return
+    loop = asyncio.get_running_loop()
+    keys = [(coin, horizon) for coin in _SUPPORTED_COINS_SORTED for horizon in _SUPPORTED_HORIZONS_SORTED]
+    results = await asyncio.gather(
+        *(loop.run_in_executor(None, _warm_model, coin, horizon) for coin, horizon in keys),
+        return_exceptions=True,
+    )
+    for (coin, horizon), result in zip(keys, results):
+        if isinstance(result, Exception):
+            detail = result.detail if isinstance(result, HTTPException) else result
+            print(f"[WARMUP] Skipping {coin}_{horizon}: {detail}")
+
+
 @app.post("/predict")
 async def predict(req: PredictRequest):
 
@@ -943,29 +1461,34 @@ async def predict(req: PredictRequest):
     use_live_data = req.use_live_data
 
     if coin not in SUPPORTED_COINS:
-        raise HTTPException(status_code=400, detail=f"Unsupported coin '{coin}'. Supported: {sorted(SUPPORTED_COINS)}")
+        raise HTTPException(status_code=400, detail=f"Unsupported coin '{coin}'. Supported: {_SUPPORTED_COINS_SORTED}")
     if horizon not in SUPPORTED_HORIZONS:
-        raise HTTPException(status_code=400, detail=f"Unsupported horizon '{horizon}'. Supported: {sorted(SUPPORTED_HORIZONS)}")
+        raise HTTPException(status_code=400, detail=f"Unsupported horizon '{horizon}'. Supported: {_SUPPORTED_HORIZONS_SORTED}")
 
     if steps_ahead <= 0:
         raise HTTPException(status_code=400, detail="steps_ahead must be >= 1 for future-only forecasting.")
 
     model, (feature_scaler, price_scaler) = load_model_and_scalers(coin, horizon)
+    batcher = _get_predict_batcher(f"{coin}_{horizon}", model)
+    (feat_scale, feat_offset), (price_scale, price_offset) = scaler_affine_cache[f"{coin}_{horizon}"]
+    # Price denormalization as a single multiply-add, and its clip bounds, hoisted
+    # out of the forecast loop
+    price_inv_scale = 1.0 / float(price_scale[0])
+    price_inv_offset = -float(price_offset[0]) * price_inv_scale
+    fr = getattr(price_scaler, "feature_range", (0.0, 1.0))
+    lo, hi = float(fr[0]), float(fr[1])
 
     # Choose data source: live Binance data or static CSV
     if use_live_data:
         try:
             # Fetch 200 klines to ensure enough data for ma_168 calculation
-            df = _fetch_binance_klines(coin, limit=200)
+            df = await _fetch_binance_klines(coin, limit=200)
         except HTTPException:
             raise
         except Exception as e:
             raise HTTPException(status_code=502, detail=f"Failed to fetch live data: {e}")
     else:
-        csv_path = DATA_DIR / "processed" / f"{coin}_processed.csv"
-        if not csv_path.exists():
-            raise HTTPException(status_code=404, detail=f"Processed CSV not found: {csv_path}")
-        df = pd.read_csv(str(csv_path), parse_dates=["open_time"]).set_index("open_time")
+        df = _load_processed_df(coin)
 
     # *** FIXED: close REMOVED from features ***
     feature_cols = [
@@ -987,12 +1510,14 @@ async def predict(req: PredictRequest):
         )
 
     H = int(horizon.replace("h", ""))
-    SEQ_LEN = 48
 
     if len(df) < SEQ_LEN:
         raise HTTPException(status_code=400, detail=f"Not enough history to forecast. Need at least {SEQ_LEN} rows.")
 
-    base_df = df.copy()
+    # Only the recent tail feeds the model windows and the synthetic-row moving
+    # averages (ma_168 looks back at most 168 rows), so avoid copying full history
+    MAX_LOOKBACK = max(168, SEQ_LEN + 1)
+    base_df = df.iloc[-MAX_LOOKBACK:]
     base_timestamp = pd.Timestamp(base_df.index[-1])
     base_close = float(base_df["close"].iloc[-1])
 
@@ -1036,66 +1561,84 @@ async def predict(req: PredictRequest):
             ),
         )
 
+    cache_key = (coin, horizon, use_live_data, base_timestamp, warmup_steps, steps_ahead)
+    cached = _prediction_cache.get(cache_key)
+    if cached and (time.time() - cached["cached_at"]) < PREDICTION_CACHE_TTL:
+        _prediction_cache.move_to_end(cache_key)
+        return _DEFAULT_RESPONSE_CLASS({**cached["response"], "requested_start_timestamp": start_ts.isoformat()})
+
     # --- CALIBRATION STEP ---
     # To prevent "way too much difference" (regime shift bias), we calibrate the model
     # by running it on the *previous* window to see what it predicts for "now".
     # We then adjust future predictions by the ratio: (Actual Now) / (Predicted Now).
+    # Later steps depend on earlier predictions, but the calibration window (t-1)
+    # and the first forecast window (t) are both observed data, so they share
+    # one forward pass.
+    # Rows first, then columns, so only the rows used are copied out of the frame
+    observed_raw = base_df.iloc[-SEQ_LEN-1:][feature_cols].to_numpy(dtype=np.float64)
+    observed = (observed_raw * feat_scale + feat_offset).astype(np.float32)
+    has_prev_window = len(observed) >= SEQ_LEN + 1
+    # (n_windows, SEQ_LEN, F) view over the observed rows; one copy into the batch
+    windows = sliding_window_view(observed, SEQ_LEN, axis=0).transpose(0, 2, 1)
+    observed_preds = (await batcher.predict(np.ascontiguousarray(windows)))[:, 0]
+    first_scaled = observed_preds[-1]
+    synthetic = _SyntheticRows(
+        observed_raw[-1], base_df["close"].to_numpy(dtype=np.float64), feature_cols,
+        horizon_hours=H, max_rows=warmup_steps + steps_ahead,
+    )
+    # Scaled model input rows (last observed window, then synthetic rows) in one
+    # preallocated buffer: each synthetic row is scaled once, in place, and every
+    # window is a contiguous view into it
+    scaled_rows = np.empty((SEQ_LEN + warmup_steps + steps_ahead, len(feature_cols)), dtype=np.float32)
+    scaled_rows[:SEQ_LEN] = observed[-SEQ_LEN:]
+    n_scaled = SEQ_LEN
+    row_buf = np.empty(len(feature_cols))
+
+    async def _next_scaled() -> float:
+        """Raw model output for the window ending at the latest (observed or synthetic) row."""
+        nonlocal first_scaled, n_scaled
+        if first_scaled is not None:
+            out, first_scaled = first_scaled, None
+            return out
+        np.multiply(synthetic.last_row, feat_scale, out=row_buf)
+        np.add(row_buf, feat_offset, out=row_buf)
+        scaled_rows[n_scaled] = row_buf
+        n_scaled += 1
+        return (await batcher.predict(scaled_rows[None, n_scaled - SEQ_LEN:n_scaled]))[0][0]
+
     calibration_ratio = 1.0
-    if len(base_df) >= SEQ_LEN + 1:
+    if has_prev_window:
         # Window for t-1 to predict t (now)
-        prev_window = base_df[feature_cols].iloc[-SEQ_LEN-1:-1].values
-        prev_window = feature_scaler.transform(prev_window)
-        prev_window = prev_window.reshape(1, SEQ_LEN, len(feature_cols))
-        
-        pred_scaled_now = model.predict(prev_window, verbose=0)[0][0]
-        fr = getattr(price_scaler, "feature_range", (0.0, 1.0))
-        lo, hi = float(fr[0]), float(fr[1])
-        pred_scaled_now = float(np.clip(pred_scaled_now, lo, hi))
-        pred_now = float(price_scaler.inverse_transform([[pred_scaled_now]])[0][0])
+        pred_scaled_now = min(max(float(observed_preds[0]), lo), hi)
+        pred_now = pred_scaled_now * price_inv_scale + price_inv_offset
         
         # Calculate ratio, clamped to avoid extreme multipliers (e.g. 0.5x to 2.0x)
         if pred_now > 0:
             calibration_ratio = base_close / pred_now
             calibration_ratio = max(0.8, min(1.2, calibration_ratio)) # Relaxed clamp to allow 20% correction
 
-    for _ in range(warmup_steps):
-        feature_window = base_df[feature_cols].iloc[-SEQ_LEN:].values
-        feature_window = feature_scaler.transform(feature_window)
-        feature_window = feature_window.reshape(1, SEQ_LEN, len(feature_cols))
-        next_scaled = model.predict(feature_window, verbose=0)[0][0]
-        fr = getattr(price_scaler, "feature_range", (0.0, 1.0))
-        lo, hi = float(fr[0]), float(fr[1])
-        next_scaled = float(np.clip(next_scaled, lo, hi))
-        next_close = float(price_scaler.inverse_transform([[next_scaled]])[0][0])
-        
-        # Apply calibration
-        next_close = next_close * calibration_ratio
-        
-        next_ts = pd.Timestamp(base_df.index[-1]) + step_delta
-        base_df = _append_synthetic_row(base_df, next_ts, next_close, horizon_hours=H)
-
-    for _ in range(steps_ahead):
-        feature_window = base_df[feature_cols].iloc[-SEQ_LEN:].values
-        feature_window = feature_scaler.transform(feature_window)
-        feature_window = feature_window.reshape(1, SEQ_LEN, len(feature_cols))
-        next_scaled = model.predict(feature_window, verbose=0)[0][0]
-        fr = getattr(price_scaler, "feature_range", (0.0, 1.0))
-        lo, hi = float(fr[0]), float(fr[1])
-        next_scaled = float(np.clip(next_scaled, lo, hi))
-        next_close = float(price_scaler.inverse_transform([[next_scaled]])[0][0])
+    next_ts = base_timestamp
+    total_steps = warmup_steps + steps_ahead
+    for step in range(total_steps):
+        next_scaled = min(max(float(await _next_scaled()), lo), hi)
+        next_close = next_scaled * price_inv_scale + price_inv_offset
 
         # Apply calibration
         next_close = next_close * calibration_ratio
 
-        next_ts = pd.Timestamp(base_df.index[-1]) + step_delta
-        future_predictions.append({
-            "timestamp": next_ts.isoformat(),
-            "predicted_price": next_close,
-        })
+        next_ts = next_ts + step_delta
+        # Warmup steps only bridge the gap up to start_ts and are not returned
+        if step >= warmup_steps:
+            future_predictions.append({
+                "timestamp": next_ts.isoformat(),
+                "predicted_price": next_close,
+            })
 
-        base_df = _append_synthetic_row(base_df, next_ts, next_close, horizon_hours=H)
+        # The last step's synthetic row would never feed a window
+        if step < total_steps - 1:
+            synthetic.append(next_close)
 
-    return {
+    response = {
         "coin": coin,
         "horizon": horizon,
         "requested_start_timestamp": start_ts.isoformat(),
@@ -1103,6 +1646,12 @@ async def predict(req: PredictRequest):
         "last_observed_close": base_close,
         "future_predictions": future_predictions,
     }
+    _prediction_cache[cache_key] = {"response": response, "cached_at": time.time()}
+    if len(_prediction_cache) > PREDICTION_CACHE_SIZE:
+        _prediction_cache.popitem(last=False)
+    # Everything in the response is already a plain str/float/list, so hand it to
+    # orjson directly rather than through FastAPI's jsonable_encoder
+    return _DEFAULT_RESPONSE_CLASS(response)
 
 
 # ============ NEWS API ENDPOINT (using free CryptoCompare) ============
@@ -1114,23 +1663,57 @@ COIN_CATEGORIES = {
     "binancecoin": "BNB"
 }
 
+# News cache: {category: {"items": list, "last_modified": str | None, "fetched_at": timestamp}}
+_news_cache: dict = {}
+NEWS_CACHE_TTL = 60  # seconds
+# Refreshes in flight: concurrent misses for a category share one upstream request
+_news_refreshes: dict = {}
+
+
+async def _refresh_news_items(category: str, cached: Optional[dict]) -> list:
+    # CryptoCompare free news API - provides real news with images
+    url = f"https://min-api.cryptocompare.com/data/v2/news/?lang=EN&categories={category}"
+    headers = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"}
+    if cached and cached["last_modified"]:
+        headers["If-Modified-Since"] = cached["last_modified"]
+    try:
+        resp = await app.state.http.get(url, headers=headers, timeout=15)
+        if resp.status_code == 304 and cached:
+            items = cached["items"]
+        else:
+            resp.raise_for_status()
+            items = _json_loads(resp.content).get("Data", [])
+            if not isinstance(items, list):
+                raise ValueError(f"unexpected news payload for {category}")
+        last_modified = resp.headers.get("Last-Modified") or (cached and cached["last_modified"])
+        _news_cache[category] = {"items": items, "last_modified": last_modified, "fetched_at": time.time()}
+        return items
+    finally:
+        _news_refreshes.pop(category, None)
+
+
+async def _fetch_news_items(category: str) -> list:
+    """Raw CryptoCompare news items for a category, cached for NEWS_CACHE_TTL."""
+    cached = _news_cache.get(category)
+    if cached and (time.time() - cached["fetched_at"]) < NEWS_CACHE_TTL:
+        return cached["items"]
+    refresh = _news_refreshes.get(category)
+    if refresh is None or refresh.get_loop() is not asyncio.get_running_loop():
+        refresh = _news_refreshes[category] = asyncio.ensure_future(_refresh_news_items(category, cached))
+    # A cancelled request must not cancel the refresh other requests are awaiting
+    return await asyncio.shield(refresh)
+
+
 @app.get("/news/{coin}")
 async def get_coin_news(coin: str, limit: int = 4):
     """Fetch latest news for a cryptocurrency from CryptoCompare (free, real news)"""
     category = COIN_CATEGORIES.get(coin, "BTC")
     
     try:
-        # CryptoCompare free news API - provides real news with images
-        url = f"https://min-api.cryptocompare.com/data/v2/news/?lang=EN&categories={category}"
-        
-        req = urllib.request.Request(url, headers={
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
-        })
-        with urllib.request.urlopen(req, timeout=15) as response:
-            data = json.loads(response.read().decode())
+        items = await _fetch_news_items(category)
         
         articles = []
-        for item in data.get("Data", [])[:limit]:
+        for item in items[:limit]:
             articles.append({
                 "title": item.get("title", ""),
                 "description": item.get("body", "")[:150] + "..." if item.get("body") else "",
@@ -1184,4 +1767,18 @@ async def get_coin_news(coin: str, limit: int = 4):
                 "image": ""
             }
         ]
-    }
\ No newline at end of file
+    }
+
+if __name__ == "__main__":
+    import uvicorn
+
+    # uvicorn's "auto" loop/http pick uvloop and httptools when they are installed
+    # (pip install uvloop httptools, or uvicorn[standard]) and fall back to asyncio/h11.
+    uvicorn.run(
+        "app:app",
+        host=os.environ.get("HOST", "127.0.0.1"),
+        port=int(os.environ.get("PORT", "8000")),
+        workers=int(os.environ.get("WEB_CONCURRENCY", "1")),
+        loop="auto",
+        http="auto",
+    )
@@ -93,7 +93,13 @@ def fine_tune_coin(self, coin: str):
 
 @app.task(bind=True, name='celery_tasks.fine_tune_all')
 def fine_tune_all(self):
-    """Fine-tune all coins."""
+    """
+    Fine-tune all coins.
+    
+    Prefork pool workers are daemonic and can't start the per-coin worker
+    processes run_all uses elsewhere, so here the coins run one after another
+    in this worker. Use a solo/threads pool to get per-coin parallelism.
+    """
     from fine_tuning_service import fine_tuning_service
     
     logger.info("Starting fine-tuning for all coins")
@@ -19,12 +19,27 @@ import numpy as np
 import pandas as pd
 import requests
 import time
+import json
 import logging
+import multiprocessing
 import joblib
+from concurrent.futures import ThreadPoolExecutor
+from joblib import Parallel, delayed
+from requests.adapters import HTTPAdapter
 from datetime import datetime, timedelta
-from typing import Dict, Optional, Tuple
+from typing import Dict, List, Optional, Tuple
 from sklearn.preprocessing import MinMaxScaler
 
+try:
+    from numba import njit
+except ImportError:  # pandas rolling fallback in compute_features
+    njit = None
+
+# Copy-on-Write (always on from pandas 3.0) makes shallow frame copies safe,
+# so compute_features doesn't need to duplicate the OHLCV block up front
+if int(pd.__version__.split(".")[0]) < 3:
+    pd.set_option("mode.copy_on_write", True)
+
 # Suppress TensorFlow warnings
 os.environ['TF_CPP_MIN_LOG_LEVEL'] = '2'
 import tensorflow as tf
@@ -34,6 +49,7 @@ BASE_DIR = "/Users/ayushgupta/Desktop/ML-Driven-Web-Platform-for-Cryptocurrency-
 MODEL_DIR = f"{BASE_DIR}/Milestone_2/models"
 DATA_DIR = f"{BASE_DIR}/Milestone_1/data"
 LOG_DIR = f"{BASE_DIR}/Milestone_3/api/logs"
+LAST_FINE_TUNE_PATH = f"{LOG_DIR}/last_fine_tune.json"
 
 # Create log directory
 os.makedirs(LOG_DIR, exist_ok=True)
@@ -110,6 +126,22 @@ FINE_TUNING_CONFIG = {
 HORIZONS = ["1h", "24h"]
 SEQ_LEN = 48
 
+# Parallel fine-tuning: one process per coin, each with a small TF thread pool
+# so the workers don't oversubscribe the CPU between them.
+FINE_TUNE_JOBS = int(os.getenv("FINE_TUNE_JOBS", len(COINS)))
+WORKER_INTRA_OP_THREADS = int(os.getenv("FINE_TUNE_WORKER_THREADS", "2"))
+
+# XLA for the fine-tune train/eval steps: "auto" compiles on GPU only (on CPU
+# the LSTM steps run slower under XLA and pay a ~20s compile), "1"/"0" force it
+FINE_TUNE_JIT_COMPILE = {"1": True, "0": False}.get(os.getenv("FINE_TUNE_JIT_COMPILE", "auto"), "auto")
+
+# Binance klines paging: 1000 candles per request, fetched a few pages at a
+# time over the service's pooled session while staying under the 1200
+# request-weight/minute budget
+KLINES_PAGE_HOURS = 1000
+KLINES_FETCH_WORKERS = 4
+BINANCE_WEIGHT_SOFT_LIMIT = 1000
+
 FEATURE_COLS = [
     "open", "high", "low", "volume",
     "return_1h", "volatility_24h",
@@ -118,11 +150,179 @@ FEATURE_COLS = [
 ]
 
 
+if njit is not None:
+    @njit(cache=True, error_model="numpy")
+    def _rolling_features_njit(close, volume, out_ret, out_vol24, out_ma24, out_ma168, out_volchg):
+        """Single pass over close/volume computing the same values as the pandas path."""
+        n = close.shape[0]
+        sum_24 = 0.0
+        sum_168 = 0.0
+        n_24, mean_24, m2_24 = 0, 0.0, 0.0
+        same_24, last_24 = 0, 0.0
+        for i in range(n):
+            # pct_change().fillna(0)
+            ret = close[i] / close[i - 1] - 1.0 if i > 0 else 0.0
+            out_ret[i] = 0.0 if np.isnan(ret) else ret
+            volchg = volume[i] / volume[i - 1] - 1.0 if i > 0 else 0.0
+            volchg = 0.0 if np.isnan(volchg) else volchg
+            out_volchg[i] = min(max(volchg, -10.0), 10.0)
+
+            # rolling(w, min_periods=1).mean() via running sums
+            sum_24 += close[i]
+            sum_168 += close[i]
+            if i >= 24:
+                sum_24 -= close[i - 24]
+            if i >= 168:
+                sum_168 -= close[i - 168]
+            out_ma24[i] = sum_24 / min(i + 1, 24)
+            out_ma168[i] = sum_168 / min(i + 1, 168)
+
+            # rolling(24, min_periods=1).std() (ddof=1), 0 for fewer than two
+            # values, via Welford add/remove so each step is O(1). Like pandas,
+            # non-finite returns are skipped and a run of equal values is exactly 0
+            x = out_ret[i]
+            if np.isfinite(x):
+                same_24 = same_24 + 1 if n_24 > 0 and x == last_24 else 1
+                last_24 = x
+                n_24 += 1
+                delta = x - mean_24
+                mean_24 += delta / n_24
+                m2_24 += delta * (x - mean_24)
+            if i >= 24:
+                x = out_ret[i - 24]
+                if not np.isfinite(x):
+                    pass
+                elif n_24 == 1:
+                    n_24, mean_24, m2_24 = 0, 0.0, 0.0
+                else:
+                    n_24 -= 1
+                    delta = x - mean_24
+                    mean_24 -= delta / n_24
+                    m2_24 -= delta * (x - mean_24)
+            if i % 24 == 23 and n_24 > 0:
+                # Re-anchor once per window (amortized O(1)) so rounding left by
+                # removing large values can't accumulate along the series
+                mean_24 = 0.0
+                for j in range(i - 23, i + 1):
+                    if np.isfinite(out_ret[j]):
+                        mean_24 += out_ret[j]
+                mean_24 /= n_24
+                m2_24 = 0.0
+                for j in range(i - 23, i + 1):
+                    if np.isfinite(out_ret[j]):
+                        m2_24 += (out_ret[j] - mean_24) ** 2
+            if n_24 < 2 or same_24 >= n_24:
+                out_vol24[i] = 0.0
+            else:
+                out_vol24[i] = np.sqrt(max(m2_24, 0.0) / (n_24 - 1))
+
+    # Compile once at import instead of on the first fine-tuning run
+    _rolling_features_njit(*(np.ones(2) for _ in range(2)), *(np.empty(2) for _ in range(5)))
+else:
+    _rolling_features_njit = None
+
+
+@tf.function(reduce_retracing=True)
+def _val_mae(model, X_val, y_val):
+    """Validation MAE as one graph call, without evaluate()'s per-call dataset setup."""
+    return tf.reduce_mean(tf.abs(model(X_val, training=False)[:, 0] - y_val))
+
+
+class _TimeoutHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter that applies a default timeout to requests that don't set one."""
+    
+    __attrs__ = HTTPAdapter.__attrs__ + ["timeout"]
+    
+    def __init__(self, *args, timeout: float = 10, **kwargs):
+        self.timeout = timeout
+        super().__init__(*args, **kwargs)
+        
+    def send(self, request, **kwargs):
+        if kwargs.get("timeout") is None:
+            kwargs["timeout"] = self.timeout
+        return super().send(request, **kwargs)
+
+
 class FineTuningService:
     """Service for fine-tuning cryptocurrency prediction models."""
     
     def __init__(self):
-        self.last_fine_tune: Dict[str, datetime] = {}
+        # Survives restarts so a redeploy doesn't re-tune every coin immediately
+        self.last_fine_tune: Dict[str, datetime] = self._read_last_fine_tune()
+        # (coin, horizon) -> (model file mtime, compiled model, fresh optimizer state)
+        self._model_cache: Dict[Tuple[str, str], Tuple[float, tf.keras.Model, List[np.ndarray]]] = {}
+        
+        # Keep-alive session shared by every Binance call this service makes
+        self.session = requests.Session()
+        self.session.headers.update({"User-Agent": "Quantara/1.0"})
+        self.session.mount("https://", _TimeoutHTTPAdapter(pool_maxsize=10, timeout=10))
+        
+        # coin -> MinMaxScaler state as plain arrays, loaded once up front
+        self.scalers: Dict[str, Dict] = {}
+        for coin in COINS:
+            try:
+                self._load_scalers(coin)
+            except Exception as e:
+                logger.warning(f"Could not preload scalers for {coin}: {e}")
+                
+    def close(self):
+        """Close pooled HTTP connections."""
+        self.session.close()
+        
+    @staticmethod
+    def _read_last_fine_tune() -> Dict[str, datetime]:
+        try:
+            with open(LAST_FINE_TUNE_PATH) as f:
+                return {coin: datetime.fromisoformat(ts) for coin, ts in json.load(f).items()}
+        except (OSError, ValueError, TypeError, AttributeError) as e:
+            if os.path.exists(LAST_FINE_TUNE_PATH):
+                logger.warning(f"Ignoring unreadable {LAST_FINE_TUNE_PATH}: {e}")
+            return {}
+            
+    def _record_fine_tune(self, coins: List[str], when: datetime):
+        """Mark coins as fine-tuned at `when` and persist the timestamps."""
+        for coin in coins:
+            self.last_fine_tune[coin] = when
+            
+        # Merge with what other worker processes may have written meanwhile
+        merged = self._read_last_fine_tune()
+        for coin, ts in self.last_fine_tune.items():
+            if coin not in merged or ts > merged[coin]:
+                merged[coin] = ts
+        self.last_fine_tune = merged
+        
+        tmp_path = f"{LAST_FINE_TUNE_PATH}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, "w") as f:
+                json.dump({coin: ts.isoformat() for coin, ts in merged.items()}, f)
+            os.replace(tmp_path, LAST_FINE_TUNE_PATH)
+        except OSError as e:
+            logger.error(f"Error saving {LAST_FINE_TUNE_PATH}: {e}")
+            
+    def _load_scalers(self, coin: str) -> Dict:
+        """
+        Return a coin's scaler state, unpickling only if the files changed
+        (update_scalers or another worker may have rewritten them).
+        """
+        scaler_dir = f"{DATA_DIR}/scaled/{coin}"
+        feature_scaler_path = f"{scaler_dir}/feature_scaler.pkl"
+        price_scaler_path = f"{scaler_dir}/price_scaler.pkl"
+        mtimes = (os.path.getmtime(feature_scaler_path), os.path.getmtime(price_scaler_path))
+        
+        scalers = self.scalers.get(coin)
+        if scalers is not None and scalers["mtimes"] == mtimes:
+            return scalers
+            
+        feature_scaler = joblib.load(feature_scaler_path)
+        price_scaler = joblib.load(price_scaler_path)
+        scalers = self.scalers[coin] = {
+            "feat_min": np.asarray(feature_scaler.min_, dtype=np.float64),
+            "feat_scale": np.asarray(feature_scaler.scale_, dtype=np.float64),
+            "price_min": float(price_scaler.min_[0]),
+            "price_scale": float(price_scaler.scale_[0]),
+            "mtimes": mtimes
+        }
+        return scalers
         
     def fetch_recent_data(self, coin: str, hours: int = 168) -> Optional[pd.DataFrame]:
         """
@@ -143,48 +343,52 @@ class FineTuningService:
         url = "https://api.binance.com/api/v3/klines"
         
         try:
-            # Fetch data in chunks
-            all_data = []
+            # Split the window into pages up front and fetch them concurrently
             end_time = int(datetime.utcnow().timestamp() * 1000)
             start_time = end_time - (hours * 60 * 60 * 1000)
+            page_ms = KLINES_PAGE_HOURS * 60 * 60 * 1000
+            pages = [
+                (start, min(start + page_ms - 1, end_time))
+                for start in range(start_time, end_time, page_ms)
+            ]
             
-            current = start_time
-            while current < end_time:
+            def fetch_page(page: Tuple[int, int]) -> list:
                 params = {
                     "symbol": symbol,
                     "interval": "1h",
-                    "startTime": current,
-                    "endTime": end_time,
+                    "startTime": page[0],
+                    "endTime": page[1],
                     "limit": 1000
                 }
-                
-                response = requests.get(url, params=params, timeout=10)
+                response = self.session.get(url, params=params)
                 response.raise_for_status()
-                data = response.json()
                 
-                if not data:
-                    break
+                # Back off until the next minute window when close to the weight limit
+                used_weight = int(response.headers.get("X-MBX-USED-WEIGHT-1M", 0))
+                if used_weight > BINANCE_WEIGHT_SOFT_LIMIT:
+                    logger.warning(f"Binance weight {used_weight}/min, pausing klines fetch")
+                    time.sleep(60 - time.time() % 60)
                     
-                all_data.extend(data)
-                current = data[-1][0] + 1
-                time.sleep(0.1)  # Rate limiting
+                return response.json()
+                
+            if len(pages) == 1:
+                # The usual window (e.g. 168h) fits in one request; skip the pool
+                all_data = fetch_page(pages[0])
+            else:
+                with ThreadPoolExecutor(max_workers=max(1, min(KLINES_FETCH_WORKERS, len(pages)))) as pool:
+                    all_data = [row for data in pool.map(fetch_page, pages) for row in data]
                 
             if not all_data:
                 logger.warning(f"No data fetched for {coin}")
                 return None
                 
-            df = pd.DataFrame(all_data, columns=[
-                "open_time", "open", "high", "low", "close", "volume",
-                "close_time", "quote_asset_volume", "num_trades",
-                "taker_buy_base", "taker_buy_quote", "ignore"
-            ])
+            # Parse the OHLCV strings straight into one float32 block
+            open_times = np.fromiter((row[0] for row in all_data), dtype=np.int64, count=len(all_data))
+            ohlcv = np.array([row[1:6] for row in all_data], dtype=np.float32)
             
-            df["open_time"] = pd.to_datetime(df["open_time"], unit="ms")
-            df = df[["open_time", "open", "high", "low", "close", "volume"]]
+            df = pd.DataFrame(ohlcv, columns=["open", "high", "low", "close", "volume"])
+            df.insert(0, "open_time", pd.to_datetime(open_times, unit="ms"))
             
-            for col in ["open", "high", "low", "close", "volume"]:
-                df[col] = pd.to_numeric(df[col], errors='coerce')
-                
             df = df.sort_values("open_time").reset_index(drop=True)
             
             logger.info(f"Fetched {len(df)} rows for {coin}")
@@ -196,34 +400,57 @@ class FineTuningService:
             
     def compute_features(self, df: pd.DataFrame) -> pd.DataFrame:
         """Compute technical features from OHLCV data."""
-        df = df.copy()
+        df = df.copy(deep=False)  # new columns stay off the caller's frame
+        
+        # Fill missing values (one pass over the OHLCV block)
+        ohlcv_cols = ["open", "high", "low", "close", "volume"]
+        df[ohlcv_cols] = df[ohlcv_cols].ffill().bfill()
         
-        # Fill missing values
-        for col in ["open", "high", "low", "close", "volume"]:
-            df[col] = df[col].ffill().bfill()
-            
         df["missing_flag"] = 0
-        df["return_1h"] = df["close"].pct_change(1).fillna(0)
-        df["volatility_24h"] = df["return_1h"].rolling(24, min_periods=1).std().fillna(0)
-        df["ma_24"] = df["close"].rolling(24, min_periods=1).mean()
-        df["ma_168"] = df["close"].rolling(168, min_periods=1).mean()
+        if _rolling_features_njit is not None:
+            close = df["close"].to_numpy(dtype=np.float64)
+            volume = df["volume"].to_numpy(dtype=np.float64)
+            ret, vol24, ma24, ma168, volchg = (np.empty(len(df)) for _ in range(5))
+            _rolling_features_njit(close, volume, ret, vol24, ma24, ma168, volchg)
+            df["return_1h"] = ret
+            df["volatility_24h"] = vol24
+            df["ma_24"] = ma24
+            df["ma_168"] = ma168
+            df["vol_change"] = volchg
+        else:
+            df["return_1h"] = df["close"].pct_change(1).fillna(0)
+            df["volatility_24h"] = df["return_1h"].rolling(24, min_periods=1).std().fillna(0)
+            df["ma_24"] = df["close"].rolling(24, min_periods=1).mean()
+            df["ma_168"] = df["close"].rolling(168, min_periods=1).mean()
+            df["vol_change"] = df["volume"].pct_change(1).fillna(0).clip(-10, 10)
         df["ma_ratio"] = (df["ma_24"] / df["ma_168"].replace(0, np.nan)).fillna(1.0)
-        df["vol_change"] = df["volume"].pct_change(1).fillna(0).clip(-10, 10)
         
-        df["ma_24"] = df["ma_24"].ffill().bfill()
-        df["ma_168"] = df["ma_168"].ffill().bfill()
+        ma_cols = ["ma_24", "ma_168"]
+        df[ma_cols] = df[ma_cols].ffill().bfill()
         
         return df.dropna()
         
-    def create_sequences(self, df: pd.DataFrame, horizon: int) -> Tuple[np.ndarray, np.ndarray]:
-        """Create sequences for training."""
-        X, y = [], []
-        
-        for i in range(SEQ_LEN, len(df) - horizon):
-            X.append(df[FEATURE_COLS].iloc[i - SEQ_LEN:i].values)
-            y.append(df["close_scaled"].iloc[i + horizon])
-            
-        return np.array(X), np.array(y)
+    def create_sequences(
+        self,
+        df: pd.DataFrame,
+        horizon: int,
+        feat: Optional[np.ndarray] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Create sequences for training (from `feat` if the feature matrix is already built)."""
+        if feat is None:
+            feat = df[FEATURE_COLS].to_numpy(dtype=np.float32)
+        target = df["close_scaled"].to_numpy(dtype=np.float32)
+        n = len(feat) - SEQ_LEN - horizon
+        if n <= 0:
+            # Too few rows for a single window (sliding_window_view needs SEQ_LEN)
+            return np.empty((0, SEQ_LEN, len(FEATURE_COLS)), dtype=np.float32), np.empty(0, dtype=np.float32)
+
+        # Window i covers rows [i, i + SEQ_LEN) and predicts row i + SEQ_LEN + horizon
+        windows = np.lib.stride_tricks.sliding_window_view(feat, (SEQ_LEN, len(FEATURE_COLS)))[:, 0]
+        X = np.ascontiguousarray(windows[:n])
+        y = target[SEQ_LEN + horizon:SEQ_LEN + horizon + n]
+
+        return X, y
         
     def fine_tune_model(
         self,
@@ -244,55 +471,88 @@ class FineTuningService:
             return False, 0.0, 0.0
             
         model_path = f"{MODEL_DIR}/{coin}/{horizon}/final_lstm_{coin}_{horizon}.keras"
+        # Fine-tuned weights live next to the .keras archive, whose graph never changes
+        weights_path = model_path[:-len(".keras")] + ".weights.h5"
         
         if not os.path.exists(model_path):
             logger.error(f"Model not found: {model_path}")
             return False, 0.0, 0.0
             
         try:
-            # Load model
-            model = tf.keras.models.load_model(model_path)
+            # Reuse the loaded, compiled model unless either file changed on disk
+            has_weights = os.path.exists(weights_path)
+            mtime = max(os.path.getmtime(model_path), os.path.getmtime(weights_path) if has_weights else 0.0)
+            cached = self._model_cache.get((coin, horizon))
+            if cached is not None and cached[0] == mtime:
+                _, model, opt_state = cached
+            else:
+                model = tf.keras.models.load_model(model_path)
+                if has_weights:
+                    model.load_weights(weights_path)
+                # Only adapt the last LSTM block and the dense head; freezing the
+                # earlier layers skips their gradients and optimizer state
+                lstm_idx = [i for i, layer in enumerate(model.layers) if isinstance(layer, tf.keras.layers.LSTM)]
+                for layer in model.layers[:lstm_idx[-1]] if lstm_idx else []:
+                    layer.trainable = False
+                model.compile(
+                    optimizer=tf.keras.optimizers.Adam(learning_rate=config.get("learning_rate", 0.0001)),
+                    loss="mse",
+                    metrics=["mae"],
+                    jit_compile=FINE_TUNE_JIT_COMPILE
+                )
+                model.optimizer.build(model.trainable_variables)
+                opt_state = [v.numpy() for v in model.optimizer.variables]
+                self._model_cache[(coin, horizon)] = (mtime, model, opt_state)
             
             # Split new data into train/val for this fine-tuning session
             split_idx = int(len(X_new) * 0.8)
             X_train, X_val = X_new[:split_idx], X_new[split_idx:]
             y_train, y_val = y_new[:split_idx], y_new[split_idx:]
             
+            X_val = tf.constant(X_val, dtype=tf.float32)
+            y_val = tf.constant(y_val, dtype=tf.float32)
+            train_ds = (
+                tf.data.Dataset.from_tensor_slices((X_train, y_train))
+                .shuffle(len(X_train))
+                .batch(config.get("batch_size", 32))
+                .prefetch(tf.data.AUTOTUNE)
+            )
+            
             # Evaluate current performance
-            old_loss, old_mae = model.evaluate(X_val, y_val, verbose=0)
+            old_mae = float(_val_mae(model, X_val, y_val))
+            old_weights = model.get_weights()
             
-            # Fine-tune
-            model.compile(
-                optimizer=tf.keras.optimizers.Adam(learning_rate=config.get("learning_rate", 0.0001)),
-                loss="mse",
-                metrics=["mae"]
-            )
+            # Start every run from a fresh Adam (zero moments, step 0) without
+            # recompiling, so no run inherits state from an earlier trajectory
+            for var, value in zip(model.optimizer.variables, opt_state):
+                var.assign(value)
             
-            model.fit(
-                X_train, y_train,
-                validation_data=(X_val, y_val),
-                epochs=config.get("epochs", 2),
-                batch_size=config.get("batch_size", 32),
-                verbose=0
-            )
+            # Fine-tune (validation only matters before/after, not per epoch)
+            model.fit(train_ds, epochs=config.get("epochs", 2), verbose=0)
             
             # Evaluate new performance
-            new_loss, new_mae = model.evaluate(X_val, y_val, verbose=0)
+            new_mae = float(_val_mae(model, X_val, y_val))
             
             # Check improvement
             improvement = old_mae - new_mae
             min_improvement = config.get("min_improvement", 0.01)
             
             if improvement >= min_improvement or new_mae <= old_mae:
-                # Save updated model
-                model.save(model_path)
+                # Save updated weights only, swapped in atomically for readers
+                tmp_path = f"{model_path}.tmp.weights.h5"
+                model.save_weights(tmp_path)
+                os.replace(tmp_path, weights_path)
+                self._model_cache[(coin, horizon)] = (max(os.path.getmtime(model_path), os.path.getmtime(weights_path)), model, opt_state)
                 logger.info(f"✅ {coin}/{horizon}: MAE {old_mae:.4f} → {new_mae:.4f} (improved by {improvement:.4f})")
                 return True, old_mae, new_mae
             else:
+                # Keep the cached model in sync with the file we didn't overwrite
+                model.set_weights(old_weights)
                 logger.info(f"⚠️ {coin}/{horizon}: MAE {old_mae:.4f} → {new_mae:.4f} (not enough improvement)")
                 return False, old_mae, new_mae
                 
         except Exception as e:
+            self._model_cache.pop((coin, horizon), None)
             logger.error(f"Error fine-tuning {coin}/{horizon}: {e}")
             return False, 0.0, 0.0
             
@@ -303,20 +563,34 @@ class FineTuningService:
         scaler_dir = f"{DATA_DIR}/scaled/{coin}"
         
         try:
-            # Load existing scalers
-            feature_scaler_path = f"{scaler_dir}/feature_scaler.pkl"
             price_scaler_path = f"{scaler_dir}/price_scaler.pkl"
+            price_range_path = f"{scaler_dir}/price_range.json"
             
-            feature_scaler = joblib.load(feature_scaler_path)
+            closes = df["close"].to_numpy()
+            new_price_min = float(closes.min())
+            new_price_max = float(closes.max())
+            
+            # The (min, max) sidecar answers the common "range unchanged" case
+            # without unpickling; it is only trusted for the pickle it was written from
+            scaler_mtime = os.path.getmtime(price_scaler_path)
+            try:
+                with open(price_range_path) as f:
+                    price_range = json.load(f)
+                if (price_range["mtime"] == scaler_mtime
+                        and price_range["min"] <= new_price_min
+                        and new_price_max <= price_range["max"]):
+                    return False
+            except (OSError, ValueError, KeyError):
+                pass
+                
             price_scaler = joblib.load(price_scaler_path)
             
             # Check if new data extends the range
             old_price_min = price_scaler.data_min_[0]
             old_price_max = price_scaler.data_max_[0]
-            new_price_min = df["close"].min()
-            new_price_max = df["close"].max()
+            updated = new_price_min < old_price_min or new_price_max > old_price_max
             
-            if new_price_min < old_price_min or new_price_max > old_price_max:
+            if updated:
                 logger.info(f"Updating scalers for {coin}: price range [{old_price_min:.2f}, {old_price_max:.2f}] → [{min(old_price_min, new_price_min):.2f}, {max(old_price_max, new_price_max):.2f}]")
                 
                 # Partial fit isn't available for MinMaxScaler, so we need to refit
@@ -325,11 +599,22 @@ class FineTuningService:
                 price_scaler.data_max_[0] = max(old_price_max, new_price_max)
                 price_scaler.data_range_[0] = price_scaler.data_max_[0] - price_scaler.data_min_[0]
                 price_scaler.scale_[0] = 1.0 / price_scaler.data_range_[0] if price_scaler.data_range_[0] != 0 else 1.0
+                # transform() is X * scale_ + min_, so min_ must follow the new range too
+                price_scaler.min_[0] = -price_scaler.data_min_[0] * price_scaler.scale_[0]
                 
                 joblib.dump(price_scaler, price_scaler_path)
-                return True
+                scaler_mtime = os.path.getmtime(price_scaler_path)
                 
-            return False
+            tmp_path = f"{price_range_path}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump({
+                    "min": float(price_scaler.data_min_[0]),
+                    "max": float(price_scaler.data_max_[0]),
+                    "mtime": scaler_mtime
+                }, f)
+            os.replace(tmp_path, price_range_path)
+            
+            return updated
             
         except Exception as e:
             logger.error(f"Error updating scalers for {coin}: {e}")
@@ -362,23 +647,27 @@ class FineTuningService:
         self.update_scalers(coin, df)
         
         # Load scalers
-        scaler_dir = f"{DATA_DIR}/scaled/{coin}"
         try:
-            feature_scaler = joblib.load(f"{scaler_dir}/feature_scaler.pkl")
-            price_scaler = joblib.load(f"{scaler_dir}/price_scaler.pkl")
+            scalers = self._load_scalers(coin)
         except Exception as e:
             logger.error(f"Error loading scalers for {coin}: {e}")
             return {"status": "error", "message": str(e)}
             
-        # Scale features
-        df[FEATURE_COLS] = feature_scaler.transform(df[FEATURE_COLS])
-        df["close_scaled"] = price_scaler.transform(df[["close"]])
+        # Scale features (MinMaxScaler.transform: X * scale_ + min_) once into the
+        # matrix every horizon windows over, selecting the columns by position
+        feature_pos = df.columns.get_indexer(FEATURE_COLS)
+        if (feature_pos < 0).any():
+            missing = [col for col, pos in zip(FEATURE_COLS, feature_pos) if pos < 0]
+            raise ValueError(f"Feature columns missing for {coin}: {missing}")
+        feat = df.iloc[:, feature_pos].to_numpy(dtype=np.float64) * scalers["feat_scale"] + scalers["feat_min"]
+        feat = feat.astype(np.float32)
+        df["close_scaled"] = df["close"].to_numpy(dtype=np.float64) * scalers["price_scale"] + scalers["price_min"]
         
         # Fine-tune each horizon
         for horizon in HORIZONS:
             h = 1 if horizon == "1h" else 24
             
-            X, y = self.create_sequences(df, h)
+            X, y = self.create_sequences(df, h, feat)
             if len(X) < 50:
                 results[horizon] = {"status": "skipped", "message": "Insufficient sequences"}
                 continue
@@ -391,23 +680,46 @@ class FineTuningService:
                 "improvement": float(old_mae - new_mae)
             }
             
-        self.last_fine_tune[coin] = datetime.utcnow()
+        self._record_fine_tune([coin], datetime.utcnow())
         
         return results
         
     def run_all(self) -> Dict:
         """Run fine-tuning for all enabled coins."""
-        results = {}
+        return self.run_coins(list(COINS.keys()))
         
-        for coin in COINS.keys():
-            try:
-                results[coin] = self.run_fine_tuning(coin)
-            except Exception as e:
-                logger.error(f"Error processing {coin}: {e}")
-                results[coin] = {"status": "error", "message": str(e)}
-                
-        return results
+    def run_coins(self, coins: List[str]) -> Dict:
+        """Run fine-tuning for the given coins, one worker process per coin."""
+        if not coins:
+            return {}
+            
+        n_jobs = min(FINE_TUNE_JOBS, len(coins))
+        if n_jobs <= 1 or multiprocessing.current_process().daemon:
+            # Daemonic processes (e.g. celery prefork workers running fine_tune_all)
+            # can't start children and joblib would quietly fall back to n_jobs=1.
+            # Run serially here instead, without pinning this process's TF threads.
+            out = [self._run_coin(coin) for coin in coins]
+        else:
+            # TensorFlow doesn't survive fork, so use loky's fresh worker processes.
+            # loky keeps its executor between calls, so every caller shares one pool
+            # whose workers hold on to their loaded, compiled models.
+            out = Parallel(n_jobs=n_jobs, backend="loky")(
+                delayed(_fine_tune_worker)(coin) for coin in coins
+            )
+            # Workers recorded their runs in their own copy of the service;
+            # pick the timestamps up from the file they merged them into
+            self.last_fine_tune.update(self._read_last_fine_tune())
+            
+        return dict(zip(coins, out))
         
+    def _run_coin(self, coin: str) -> Dict:
+        """run_fine_tuning, with errors reported in the result instead of raised."""
+        try:
+            return self.run_fine_tuning(coin)
+        except Exception as e:
+            logger.error(f"Error processing {coin}: {e}")
+            return {"status": "error", "message": str(e)}
+            
     def should_fine_tune(self, coin: str) -> bool:
         """Check if it's time to fine-tune a coin."""
         config = FINE_TUNING_CONFIG.get(coin, {})
@@ -428,22 +740,33 @@ class FineTuningService:
 fine_tuning_service = FineTuningService()
 
 
+def _fine_tune_worker(coin: str) -> Dict:
+    """Fine-tune one coin inside a loky worker process (never the caller's process)."""
+    try:
+        tf.config.threading.set_intra_op_parallelism_threads(WORKER_INTRA_OP_THREADS)
+    except RuntimeError:
+        pass  # TF runtime already initialized in this (reused) worker
+        
+    return fine_tuning_service._run_coin(coin)
+
+
 def run_scheduled_fine_tuning():
     """Entry point for scheduled fine-tuning."""
     logger.info("=" * 60)
     logger.info("SCHEDULED FINE-TUNING STARTED")
     logger.info("=" * 60)
     
+    due = []
     for coin in COINS.keys():
         if fine_tuning_service.should_fine_tune(coin):
-            try:
-                result = fine_tuning_service.run_fine_tuning(coin)
-                logger.info(f"{coin}: {result}")
-            except Exception as e:
-                logger.error(f"Error fine-tuning {coin}: {e}")
+            due.append(coin)
         else:
             logger.info(f"{coin}: Skipping (not due yet)")
             
+    # Due coins train side by side in the shared worker pool
+    for coin, result in fine_tuning_service.run_coins(due).items():
+        logger.info(f"{coin}: {result}")
+        
     logger.info("=" * 60)
     logger.info("SCHEDULED FINE-TUNING COMPLETED")
     logger.info("=" * 60)
@@ -98,7 +98,7 @@ def main():
             for coin, last_run in fine_tuning_service.last_fine_tune.items():
                 print(f"  {coin}: {last_run}")
             if not fine_tuning_service.last_fine_tune:
-                print("  No fine-tuning runs recorded in this session.")
+                print("  No fine-tuning runs recorded yet.")
             return
             
         if arg in COINS: